@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: cooldown index
+Builds an old-format sent log (ISO strings) with 1M historical owners
+spread over a year, migrates it to epoch seconds, and compares the old
+per-check query + fromisoformat with CooldownIndex: load time, memory
+and check cost, for the default 2-day cooldown and for a window holding
+every owner.
+Usage: python benchmarks/bench_cooldown.py [--owners 1000000] [--days 365]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.cooldown import CooldownIndex
+from tgsimilarspam.state_store import StateStore
+
+
+def make_legacy_db(path, owners, days, now, rng):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE sent_log (owner TEXT PRIMARY KEY, sent_at TEXT NOT NULL)')
+    conn.executemany(
+        'INSERT INTO sent_log(owner, sent_at) VALUES (?, ?)',
+        ((f"owner{i}", datetime.fromtimestamp(now - rng.random() * days * 86400).isoformat())
+         for i in range(owners))
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_checks(path, names, cooldown_days):
+    """Old is_owner_in_cooldown: one query and one ISO parse per check"""
+    conn = sqlite3.connect(path)
+    t0 = time.perf_counter()
+    active = 0
+    for owner in names:
+        row = conn.execute('SELECT sent_at FROM sent_log WHERE owner = ?', (owner,)).fetchone()
+        if row is not None and (datetime.now() - datetime.fromisoformat(row[0])).days < cooldown_days:
+            active += 1
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    return elapsed / len(names), active
+
+
+def index_run(store, cooldown_days, names, now):
+    t0 = time.perf_counter()
+    pruned = store.prune_sent(now - cooldown_days * 86400)
+    prune_time = time.perf_counter() - t0
+    # Memory from a traced load, time from an untraced one (tracemalloc slows allocation)
+    tracemalloc.start()
+    index = CooldownIndex(store, cooldown_days * 86400).load(now)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del index
+    index = CooldownIndex(store, cooldown_days * 86400).load(now)
+    t0 = time.perf_counter()
+    active = sum(1 for owner in names if index.active(owner, now))
+    check = (time.perf_counter() - t0) / len(names)
+    print(f"    {cooldown_days:4} days  {len(index):8} active   load {index.load_seconds:6.2f}s   "
+          f"memory {memory / 1e6:7.1f} MB ({index.memory_bytes() / 1e6:.1f} MB estimate)   "
+          f"check {check * 1e9:6.0f} ns")
+    if pruned:
+        print(f"               pruned {pruned} expired rows in {prune_time:.2f}s (once)")
+    return active
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--owners', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365, help='history spread over this many days')
+    parser.add_argument('--cooldown-days', type=int, default=2)
+    parser.add_argument('--checks', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = time.time()
+    workdir = tempfile.mkdtemp(prefix='bench_cooldown_')
+    path = os.path.join(workdir, 'state.db')
+    t0 = time.perf_counter()
+    make_legacy_db(path, args.owners, args.days, now, rng)
+    print(f"[*] {args.owners} owners over {args.days} days (built in {time.perf_counter() - t0:.1f}s)")
+
+    names = [f"owner{rng.randrange(args.owners * 2)}" for _ in range(args.checks)]
+    per_check, legacy_active = legacy_checks(path, names[:20000], args.cooldown_days)
+    print(f"    old check (query + fromisoformat): {per_check * 1e6:.1f} us")
+
+    t0 = time.perf_counter()
+    store = StateStore(path)
+    print(f"    ISO -> epoch migration: {time.perf_counter() - t0:.2f}s")
+
+    # Whole history first: the short cooldown prunes the store
+    index_run(store, args.days + 1, names, now)
+    active = index_run(store, args.cooldown_days, names[:20000], now)
+    print(f"    same verdicts as the old check: {active == legacy_active} ({active} active)")
+    store.close()
+    print(f"[*] Work dir: {workdir}")
+
+
+if __name__ == '__main__':
+    main()
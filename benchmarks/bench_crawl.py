@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: full offline crawl
+Runs TelegramBDBot.run() against a ReplayClient over a synthetic channel
+graph (or recorded fixtures) in a temporary directory with its own
+state.db. Reports channels/s, API calls per channel, peak Python memory
+and the memory the bot still holds per channel after the crawl
+(tracemalloc; the replay client's own objects are left out).
+Usage: python benchmarks/bench_crawl.py [--nodes 1000] [--fan 10] [--workers 4]
+       [--latency 0.05] [--flood-every 50] [--fixtures calls.jsonl] [--send] [--trace]
+       [--visited bloom]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.bot import TelegramBDBot
+from tgsimilarspam.config import Config
+from tgsimilarspam.telegram_replay import ReplayClient, SyntheticGraph
+
+
+def make_config(args, seeds):
+    return Config({
+        'phone': 'bench',
+        'seed_channels': seeds,
+        'keywords': args.keywords,
+        'msg_ru': 'Привет',
+        'msg_en': 'Hello',
+        'max_sent_per_run': args.max_sent,
+        'send_delay_seconds': 0,
+        'channel_delay_seconds': 0,
+        'discovery_workers': args.workers,
+        'max_depth': args.depth,
+        'similar_limit': args.fan,
+        # The limiter stays in the path, but never throttles
+        'api_rate_per_second': 1e9,
+        'api_burst': 1e9,
+        'flood_max_wait_seconds': 60,
+        'visited_backend': args.visited,
+        'visited_bloom_capacity': max(args.nodes, 1000),
+    })
+
+
+# The synthetic graph and the Telethon objects it builds belong to the replay client
+REPLAY_FILES = ('*telegram_replay.py', '*telethon*')
+
+
+def bot_memory():
+    """Traced bytes allocated outside the replay client"""
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in REPLAY_FILES])
+    return sum(stat.size for stat in snapshot.statistics('filename'))
+
+
+async def crawl(bot, args):
+    await bot.client.connect()
+    baseline = bot_memory() if tracemalloc.is_tracing() else 0
+    t0 = time.perf_counter()
+    await bot.run(send=args.send, max_sent=args.max_sent)
+    elapsed = time.perf_counter() - t0
+    # What the crawl state still holds before close() releases it
+    retained = bot_memory() - baseline if tracemalloc.is_tracing() else 0
+    t0 = time.perf_counter()
+    await bot.close()
+    return elapsed, time.perf_counter() - t0, retained
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--fan', type=int, default=10)
+    parser.add_argument('--seeds', type=int, default=5)
+    parser.add_argument('--depth', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per API call')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--flood-every', type=int, default=0, help='FloodWait on every Nth call of a type')
+    parser.add_argument('--flood-seconds', type=int, default=0)
+    parser.add_argument('--fixtures', help='replay a file written by --record')
+    parser.add_argument('--keywords', nargs='*', default=[])
+    parser.add_argument('--send', action='store_true', help='send mode (sequential, no delays)')
+    parser.add_argument('--max-sent', type=int, default=10 ** 9)
+    parser.add_argument('--visited', choices=['set', 'bloom'], default='set', help='visited-set backend')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc (it slows the crawl)')
+    parser.add_argument('--verbose', action='store_true', help='show the bot output')
+    parser.add_argument('--trace', action='store_true', help='write trace.json and print time per span')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_crawl_')
+    fixtures = os.path.abspath(args.fixtures) if args.fixtures else None
+    os.chdir(workdir)
+
+    graph = SyntheticGraph(args.nodes, args.fan)
+    config = make_config(args, graph.seeds(args.seeds))
+    client = ReplayClient(fixtures=fixtures, graph=graph, latency=args.latency, jitter=args.jitter,
+                          flood_every=args.flood_every, flood_seconds=args.flood_seconds)
+    if not args.no_memory:
+        tracemalloc.start()
+    bot = TelegramBDBot(config, client=client)
+    if args.trace:
+        bot.enable_tracing(os.path.join(workdir, 'trace.json'))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        elapsed, close_time, retained = asyncio.run(crawl(bot, args))
+    peak = tracemalloc.get_traced_memory()[1] if not args.no_memory else 0
+    tracemalloc.stop()
+
+    channels = bot.budget.channels
+    calls = bot.limiter.total_calls()
+    print(f"[*] Graph: {args.nodes} nodes, fan-out {args.fan}, {args.workers} workers, "
+          f"latency {args.latency * 1000:.0f}ms, mode {'SEND' if args.send else 'DISCOVER'}")
+    print(f"    Channels:     {channels} in {elapsed:.2f}s ({channels / elapsed:.1f} channels/s)")
+    print(f"    API calls:    {calls} ({calls / max(channels, 1):.2f} per channel)")
+    for kind, count in sorted(bot.limiter.calls.items()):
+        print(f"      {kind:16} {count:8} ({count / max(channels, 1):.2f} per channel)")
+    if client.floods:
+        print(f"    Flood waits:  {client.floods} injected, {bot.limiter.flood_seconds}s asked")
+    print(f"    Results:      {len(bot.tally)} rows ({bot.tally.summary()}), "
+          f"close + export {close_time:.2f}s")
+    print(f"    Visited:      {bot.processed_channels.summary()}")
+    if peak:
+        print(f"    Peak memory:  {peak / 1e6:.1f} MB ({peak / max(channels, 1) / 1e3:.1f} KB per channel)")
+        print(f"    Retained:     {retained / 1e6:.1f} MB by the bot after the crawl "
+              f"({retained / max(channels, 1):.0f} bytes per channel)")
+    if args.trace:
+        print("    Time per span (summed over tasks):")
+        for name, seconds in sorted(bot.tracer.totals().items(), key=lambda item: -item[1])[:15]:
+            print(f"      {name:24} {seconds:8.2f}s")
+    print(f"[*] Work dir: {workdir}")
+
+
+if __name__ == '__main__':
+    main()
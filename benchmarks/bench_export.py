@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: results export
+Fills a state store with synthetic results and exports them in every
+format, at two store sizes: time per row, file size and peak Python
+memory. Peak memory should stay flat as the store grows (rows stream
+from SQLite in chunks). Parquet is skipped when pyarrow is missing.
+Usage: python benchmarks/bench_export.py [--rows 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.export import ExportError, export_results, WRITERS
+from tgsimilarspam.state_store import StateStore
+
+STATUSES = ('sent', 'test', 'no_owner', 'cooldown', 'replied', 'error')
+
+
+def fill(store, start, count):
+    batch = []
+    for i in range(start, start + count):
+        batch.append({
+            'channel': f"channel_{i}",
+            'owner': f"owner_{i}",
+            'lang': 'RU' if i % 5 else 'EN',
+            'status': STATUSES[i % len(STATUSES)],
+            'date': f"2026-{1 + i // 7 % 12:02d}-{1 + i % 28:02d} 12:00:00",
+        })
+        if len(batch) >= 10000:
+            store.add_results(batch)
+            batch = []
+    store.add_results(batch)
+
+
+def run(store, workdir, fmt, **filters):
+    path = os.path.join(workdir, f"export.{fmt}")
+    # Time from an untraced run, memory from a traced one (tracemalloc slows allocation)
+    t0 = time.perf_counter()
+    try:
+        count, _ = export_results(store, path, fmt, **filters)
+    except ExportError as e:
+        print(f"    {fmt:8} skipped: {e}")
+        return
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    export_results(store, path, fmt, **filters)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"    {fmt:8} {count:8} rows  {elapsed:6.2f}s  {elapsed / max(count, 1) * 1e6:6.1f} us/row  "
+          f"{os.path.getsize(path) / 1e6:7.1f} MB file  peak memory {peak / 1e6:5.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = StateStore(os.path.join(workdir, 'state.db'))
+        done = 0
+        for size in (args.rows // 4, args.rows):
+            fill(store, done, size - done)
+            done = size
+            print(f"[*] {size} results")
+            for fmt in WRITERS:
+                run(store, workdir, fmt)
+        print("[*] Filtered: status sent, language EN, one month")
+        run(store, workdir, 'csv', statuses=['sent'], langs=['EN'], since='2026-03-01', until='2026-03-31')
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: language detection on large post batches
+Compares the old per-character loop with ScriptDetector.
+Usage: python benchmarks/bench_language_detector.py [channels]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tgsimilarspam.language_detector import ScriptDetector
+
+CHANNELS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+POSTS_PER_CHANNEL = 5
+
+RU_WORDS = "новости крипта биткоин рынок сигнал обзор канал торговля прибыль анализ".split()
+EN_WORDS = "news crypto bitcoin market signal review channel trading profit analysis".split()
+NOISE = ["🚀", "100%", "$BTC", "https://t.me/x", "#1", "—", "12.5k"]
+
+
+def make_post(rng):
+    words = RU_WORDS if rng.random() < 0.5 else EN_WORDS
+    mixed = [rng.choice(words if rng.random() < 0.85 else EN_WORDS + NOISE) for _ in range(rng.randint(40, 200))]
+    return ' '.join(mixed)
+
+
+def legacy_detect(texts):
+    """Old detect_language_from_posts body"""
+    def is_cyrillic_char(char):
+        return 0x0400 <= ord(char) <= 0x04FF
+
+    cyrillic = 0
+    latin = 0
+    for text in texts:
+        for char in text:
+            if char.isalpha():
+                if is_cyrillic_char(char):
+                    cyrillic += 1
+                else:
+                    latin += 1
+
+    total = cyrillic + latin
+    if total == 0:
+        return None
+    cyrillic_pct = (cyrillic / total) * 100
+    if cyrillic_pct >= 30:
+        return 'RU'
+    elif cyrillic_pct < 10:
+        return 'EN'
+    return None
+
+
+def main():
+    rng = random.Random(42)
+    batches = [[make_post(rng) for _ in range(POSTS_PER_CHANNEL)] for _ in range(CHANNELS)]
+    chars = sum(len(t) for b in batches for t in b)
+    print(f"[*] {CHANNELS} channels x {POSTS_PER_CHANNEL} posts, {chars / 1e6:.1f}M chars")
+
+    t0 = time.perf_counter()
+    legacy = [legacy_detect(b) for b in batches]
+    t_legacy = time.perf_counter() - t0
+    print(f"    legacy loop:     {t_legacy:.3f}s ({chars / t_legacy / 1e6:.1f}M chars/s)")
+
+    detector = ScriptDetector()
+    t0 = time.perf_counter()
+    fast = detector.detect_many(batches)
+    t_fast = time.perf_counter() - t0
+    print(f"    ScriptDetector:  {t_fast:.3f}s ({chars / t_fast / 1e6:.1f}M chars/s)")
+
+    mismatches = sum(1 for a, b in zip(legacy, fast) if a != b)
+    print(f"[*] Speedup: {t_legacy / t_fast:.1f}x, verdict mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: incremental post cache
+Crawls a synthetic graph three times over the same state.db with the
+language cache off, so every channel needs its posts: a cold run, a run
+inside post_cache_ttl_hours (cached texts, no calls) and a run after it
+(min_id refresh: channels without new posts answer with nothing). Prints
+get_messages calls, messages downloaded and crawl time per run.
+Usage: python benchmarks/bench_posts.py [--nodes 2000] [--latency 0.02]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.bot import TelegramBDBot
+from tgsimilarspam.config import Config
+from tgsimilarspam.telegram_replay import ReplayClient, SyntheticGraph
+
+
+class CountingClient(ReplayClient):
+    """Counts messages handed out, not just calls"""
+
+    downloaded = 0
+
+    async def get_messages(self, *args, **kwargs):
+        messages = await super().get_messages(*args, **kwargs)
+        self.downloaded += len(messages)
+        return messages
+
+
+async def crawl(graph, args, ttl_hours):
+    config = Config({
+        'phone': 'bench',
+        'seed_channels': graph.seeds(5),
+        'msg_ru': 'Привет',
+        'msg_en': 'Hello',
+        'channel_delay_seconds': 0,
+        'discovery_workers': args.workers,
+        'max_depth': 10,
+        'api_rate_per_second': 1e9,
+        'api_burst': 1e9,
+        # Every channel goes to its posts
+        'language_cache_ttl_days': 0,
+        'post_cache_ttl_hours': ttl_hours,
+    })
+    client = CountingClient(graph=graph, latency=args.latency)
+    bot = TelegramBDBot(config, client=client)
+    await bot.client.connect()
+    t0 = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        await bot.run(send=False, max_sent=10 ** 9)
+        elapsed = time.perf_counter() - t0
+        await bot.close()
+    return bot, client, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per API call')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_posts_')
+    os.chdir(workdir)
+    graph = SyntheticGraph(args.nodes)
+    print(f"[*] {args.nodes} channels, latency {args.latency * 1000:.0f}ms")
+    for label, ttl_hours in (('cold', 24), ('cached', 24), ('stale', 0)):
+        bot, client, elapsed = asyncio.run(crawl(graph, args, ttl_hours))
+        posts = bot.posts
+        print(f"    {label:7} get_messages {client.calls.get('get_messages', 0):6}   "
+              f"messages downloaded {client.downloaded:6}   crawl {elapsed:6.2f}s   "
+              f"(cache {posts.hits}, min_id {posts.refreshed + posts.unchanged}, full {posts.fetched})")
+    print(f"[*] Work dir: {workdir}")
+
+
+if __name__ == '__main__':
+    main()
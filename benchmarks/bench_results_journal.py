@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-row cost of saving results
+Compares the old load_workbook/save per row against the journal writer.
+Usage: python benchmarks/bench_results_journal.py [rows]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+
+from tgsimilarspam.results_journal import ResultsJournal, append_jsonl, iter_journal
+from tgsimilarspam.export import write_xlsx
+from tgsimilarspam.state_store import StateStore
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+CHUNK = ROWS // 10
+LEGACY_ROWS = 1000
+
+
+def make_result(i):
+    return {
+        'channel': f'channel_{i}',
+        'owner': f'owner_{i}',
+        'lang': 'EN',
+        'status': 'sent',
+        'date': '2026-01-01 00:00:00',
+    }
+
+
+def bench_legacy(path):
+    """Old save_result_incremental: reopen and rewrite the workbook per row"""
+    print(f"[*] Legacy per-row workbook rewrite ({LEGACY_ROWS} rows)")
+    step = LEGACY_ROWS // 5
+    for start in range(0, LEGACY_ROWS, step):
+        t0 = time.perf_counter()
+        for i in range(start, start + step):
+            if os.path.exists(path):
+                wb = openpyxl.load_workbook(path)
+                ws = wb.active
+                row = ws.max_row + 1
+            else:
+                wb = openpyxl.Workbook()
+                ws = wb.active
+                ws.cell(1, 1, 'Channel Link')
+                ws.cell(1, 2, 'Owner Username')
+                row = 2
+            ws[f'A{row}'] = f"https://t.me/channel_{i}"
+            ws[f'B{row}'] = f"@owner_{i}"
+            wb.save(path)
+        per_row = (time.perf_counter() - t0) / step * 1e6
+        print(f"    rows {start:>6}-{start + step:<6} {per_row:>10.1f} us/row")
+
+
+async def bench_journal(label, sink):
+    """New path: append to buffer, background writer flushes batches"""
+    print(f"[*] Journal append + background flush into {label} ({ROWS} rows)")
+    journal = ResultsJournal(sink, flush_interval=0.05)
+    journal.start()
+    for start in range(0, ROWS, CHUNK):
+        t0 = time.perf_counter()
+        for i in range(start, start + CHUNK):
+            journal.append(make_result(i))
+            if i % journal.batch_size == 0:
+                # Give the writer a turn, like the crawl does between channels
+                await asyncio.sleep(0)
+        await journal.flush()
+        per_row = (time.perf_counter() - t0) / CHUNK * 1e6
+        print(f"    rows {start:>6}-{start + CHUNK:<6} {per_row:>10.1f} us/row")
+    await journal.close()
+
+
+def bench_export(rows, xlsx_path):
+    t0 = time.perf_counter()
+    count = write_xlsx(rows, xlsx_path)
+    elapsed = time.perf_counter() - t0
+    print(f"[*] Streaming xlsx export: {count} rows in {elapsed:.2f}s "
+          f"({elapsed / count * 1e6:.1f} us/row)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_legacy(os.path.join(tmp, 'legacy.xlsx'))
+        journal_path = os.path.join(tmp, 'results.jsonl')
+        asyncio.run(bench_journal('JSONL', partial(append_jsonl, journal_path)))
+        bench_export(iter_journal(journal_path), os.path.join(tmp, 'contacts.xlsx'))
+
+        store = StateStore(os.path.join(tmp, 'state.db'))
+        asyncio.run(bench_journal('SQLite', store.add_results))
+        bench_export(store.iter_results(), os.path.join(tmp, 'contacts.xlsx'))
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: CLI startup time
+Runs each command in a fresh interpreter (in a temporary directory with a
+config.json and an empty state.db) and reports min / median wall time.
+"import tgsimilarspam.bot" is what every run used to pay before the CLI
+loaded Telethon and the bot lazily.
+Usage: python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.state_store import StateStore
+
+COMMANDS = [
+    ('interpreter', ['-c', 'pass']),
+    ('import tgsimilarspam', ['-c', 'import tgsimilarspam']),
+    ('--help', ['-m', 'tgsimilarspam', '--help']),
+    ('stats', ['-m', 'tgsimilarspam', 'stats']),
+    ('export', ['-m', 'tgsimilarspam', 'export']),
+    ('main_bot.py --help', [os.path.join(ROOT, 'main_bot.py'), '--help']),
+    ('import tgsimilarspam.bot', ['-c', 'import tgsimilarspam.bot']),
+]
+
+
+def time_command(argv, runs, env):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + argv, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    os.chdir(workdir)
+    with open('config.json', 'w', encoding='utf-8') as f:
+        json.dump({'phone': 'bench', 'msg_en': 'Hello'}, f)
+    StateStore('state.db').close()
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    print(f"[*] {args.runs} runs per command, fresh interpreter each")
+    for name, argv in COMMANDS:
+        best, median = time_command(argv, args.runs, env)
+        print(f"    {name:26} min {best * 1000:7.1f}ms   median {median * 1000:7.1f}ms")
+    print(f"[*] Work dir: {workdir}")
+
+
+if __name__ == '__main__':
+    main()
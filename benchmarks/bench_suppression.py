@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: do-not-contact index
+Loads a large suppression list (text file plus state.db rows) into the
+exact set and into a Bloom filter backed by state.db, and reports load
+time (first import and unchanged lists), memory, lookup cost, and how
+many Bloom false positives went to disk (none may end up suppressed).
+Usage: python benchmarks/bench_suppression.py [--handles 500000] [--error-rate 0.001]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.state_store import StateStore
+from tgsimilarspam.suppression import LIST_SIGNATURE_KEY, SuppressionIndex
+
+
+def make_handles(count, rng, prefix):
+    return [f"{prefix}{rng.randrange(10 ** 9):09d}_{i}" for i in range(count)]
+
+
+def measure(store, list_file, error_rate, present, absent):
+    # Memory from a traced load, times from untraced ones (tracemalloc slows allocation)
+    store.set_meta(LIST_SIGNATURE_KEY, '')
+    first = SuppressionIndex(store, [list_file], error_rate).load()
+    tracemalloc.start()
+    index = SuppressionIndex(store, [list_file], error_rate).load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del index
+    index = SuppressionIndex(store, [list_file], error_rate).load()
+
+    t0 = time.perf_counter()
+    hits = sum(1 for h in present if index.check(h))
+    hit_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    wrong = sum(1 for h in absent if h in index)
+    miss_time = time.perf_counter() - t0
+
+    name = f"Bloom {error_rate}" if error_rate else "exact set"
+    print(f"    {name:14} load {first.load_seconds:6.2f}s ({index.load_seconds:.2f}s unchanged)   "
+          f"memory {memory / 1e6:7.1f} MB   "
+          f"lookup {hit_time / len(present) * 1e6:5.2f} / {miss_time / len(absent) * 1e6:5.2f} us (hit / miss)")
+    print(f"    {'':14} found {hits}/{len(present)}, wrongly suppressed {wrong}/{len(absent)}, "
+          f"Bloom false positives checked on disk {index.false_positives}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--handles', type=int, default=500000, help='handles in the list file')
+    parser.add_argument('--db-handles', type=int, default=50000, help='handles in state.db (replied / opt-out)')
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    parser.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    workdir = tempfile.mkdtemp(prefix='bench_suppression_')
+    list_file = os.path.join(workdir, 'do_not_contact.txt')
+    listed = make_handles(args.handles, rng, 'user')
+    with open(list_file, 'w', encoding='utf-8') as f:
+        f.write('# internal exclusion list\n')
+        f.writelines(f"@{h}\n" for h in listed)
+    store = StateStore(os.path.join(workdir, 'state.db'))
+    replied = make_handles(args.db_handles, rng, 'replied')
+    store.add_suppressed((h, 'replied') for h in replied)
+
+    present = rng.sample(listed, min(args.lookups // 2, len(listed)))
+    present += rng.sample(replied, min(args.lookups // 2, len(replied)))
+    absent = make_handles(args.lookups, rng, 'fresh')
+
+    print(f"[*] {args.handles} listed + {args.db_handles} stored handles, {len(present)} + {len(absent)} lookups")
+    measure(store, list_file, 0, present, absent)
+    measure(store, list_file, args.error_rate, present, absent)
+    store.close()
+    print(f"[*] Work dir: {workdir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: visited-set backends
+Adds N synthetic channel names to each backend (exact set, Bloom filter
++ on-disk set) and compares memory, cost per add, and lookups of visited
+and unvisited names, with the false positives the Bloom filter sent to
+disk.
+Usage: python benchmarks/bench_visited.py [--channels 1000000] [--error-rate 0.001]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tgsimilarspam.state_store import StateStore
+from tgsimilarspam.visited import VisitedSet, BloomVisitedSet
+
+
+def names(start, count):
+    # New string objects every time, like names parsed from API answers
+    return (f"channel_{i:08d}" for i in range(start, start + count))
+
+
+def fill(visited, count):
+    for name in names(0, count):
+        visited.add(name)
+    visited.flush()
+    return visited
+
+
+def run(label, make, count, lookups):
+    # Memory from a traced build, time from an untraced one (tracemalloc slows allocation)
+    tracemalloc.start()
+    visited = fill(make(), count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del visited
+
+    t0 = time.perf_counter()
+    visited = fill(make(), count)
+    add = (time.perf_counter() - t0) / count
+    t0 = time.perf_counter()
+    hits = sum(1 for name in names(0, lookups) if name in visited)
+    hit = (time.perf_counter() - t0) / lookups
+    t0 = time.perf_counter()
+    misses = sum(1 for name in names(count, lookups) if name not in visited)
+    miss = (time.perf_counter() - t0) / lookups
+    assert hits == lookups and misses == lookups
+
+    print(f"    {label:6} memory {memory / 1e6:7.1f} MB ({memory / count:5.1f} bytes/channel)   "
+          f"add {add * 1e6:5.1f} us   visited {hit * 1e6:5.1f} us   unvisited {miss * 1e6:5.1f} us")
+    print(f"           {visited.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--channels', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    args = parser.parse_args()
+
+    print(f"[*] {args.channels} visited channels, {args.lookups} lookups each way")
+    run('set', VisitedSet, args.channels, args.lookups)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = StateStore(os.path.join(workdir, 'state.db'))
+
+        def make():
+            visited = BloomVisitedSet(store, args.channels, args.error_rate)
+            visited.reset()
+            return visited
+
+        run('bloom', make, args.channels, args.lookups)
+        print(f"           state.db: {os.path.getsize(os.path.join(workdir, 'state.db')) / 1e6:.1f} MB "
+              f"(+ WAL {os.path.getsize(os.path.join(workdir, 'state.db-wal')) / 1e6:.1f} MB)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+TGSimilarSpam - Telegram Channel Discovery & BD Messaging Bot
+Importing the package is cheap: the bot (and Telethon with it) loads on
+first access to TelegramBDBot.
+"""
+
+from .config import Config, ConfigError
+
+__all__ = ['Config', 'ConfigError', 'TelegramBDBot']
+
+
+def __getattr__(name):
+    if name == 'TelegramBDBot':
+        from .bot import TelegramBDBot
+        return TelegramBDBot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
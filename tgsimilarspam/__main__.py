@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""python -m tgsimilarspam {discover,send,export,stats}"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bloom filter
+Fixed-size bit array with k positions per key (double hashing over one
+blake2b digest). A few bits per key instead of a Python string in a set;
+"maybe present" answers are wrong with the configured probability,
+"absent" answers never are.
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _probe(self, key):
+        """First bit position and step: position i is h1 + i * h2 (mod size)"""
+        h = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+        return (h >> 64) % self.size, ((h & 0xFFFFFFFFFFFFFFFF) | 1) % self.size
+
+    def add(self, key):
+        bits, size = self.bits, self.size
+        pos, step = self._probe(key)
+        for _ in range(self.hashes):
+            bits[pos >> 3] |= 1 << (pos & 7)
+            pos += step
+            if pos >= size:
+                pos -= size
+        self.count += 1
+
+    def __contains__(self, key):
+        bits, size = self.bits, self.size
+        pos, step = self._probe(key)
+        for _ in range(self.hashes):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+            pos += step
+            if pos >= size:
+                pos -= size
+        return True
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+    def false_positive_rate(self):
+        """Expected false positive rate at the current fill"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Discovery & messaging bot
+Recursively finds similar channels, identifies owners, sends bulk messages.
+All settings come from a Config object passed to the constructor.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from telethon import TelegramClient, events, utils
+from telethon.tl.types import InputPeerUser
+from telethon.tl.functions.channels import GetFullChannelRequest, GetChannelRecommendationsRequest
+
+from .config import SENT_LOG_FILE, DATA_FILE, RESULTS_JOURNAL_FILE, STATE_DB_FILE
+from .results_journal import ResultsJournal, ResultRecord, ResultTally
+from .export import write_xlsx
+from .state_store import StateStore
+from .crawl_frontier import CrawlFrontier
+from .entity_cache import EntityCache
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .language_detector import ScriptDetector
+from .owner_extractor import OwnerExtractor
+from .suppression import SuppressionIndex
+from .cooldown import CooldownIndex
+from .dialog_index import DialogIndex
+from .visited import make_visited
+from .recommendation_graph import RecommendationGraph
+from .post_cache import PostCache
+from .keyword_matcher import KeywordMatcher
+from .budget import CrawlBudget
+from .metrics import Metrics
+from .tracing import Tracer, instrument
+from .event_log import EventLog
+
+# ==================== BOT ====================
+
+class TelegramBDBot:
+    def __init__(self, config, client=None):
+        self.config = config
+        # FloodWait is handled (and measured) by our limiter, not slept away inside Telethon
+        if client is None:
+            client = TelegramClient(f'session_{config.phone}', config.api_id, config.api_hash,
+                                    flood_sleep_threshold=0)
+        self.client = client
+        # Counts only: result rows go to the journal and are freed once written
+        self.tally = ResultTally()
+        self.sent_count = 0
+        self.error_count = 0
+        self.store = StateStore(STATE_DB_FILE)
+        self.store.migrate_legacy(SENT_LOG_FILE, RESULTS_JOURNAL_FILE, DATA_FILE)
+        self.processed_channels = make_visited(config, self.store)
+        self.journal = ResultsJournal(self.store.add_results)
+        self.events = EventLog(config.events_file, console=config.console_progress,
+                               max_bytes=int(config.events_max_mb * 1e6), backups=config.events_backups)
+        self.frontier = CrawlFrontier(self.store)
+        self.entities = EntityCache(
+            maxsize=config.entity_cache_size,
+            ttl=config.entity_cache_ttl_hours * 3600,
+            store=self.store if config.entity_cache_persist else None
+        )
+        self.metrics = Metrics(config.metrics_file, config.metrics_summary_file, config.metrics_interval_seconds)
+        self.metrics.collectors.append(self.collect_metrics)
+        self.owner_queue = None
+        self.tracer = Tracer()
+        self.limiter = RateLimiter(config.api_rate_per_second, config.api_burst, rates=config.api_rates,
+                                   max_wait=config.flood_max_wait_seconds, metrics=self.metrics,
+                                   tracer=self.tracer)
+        self.lang_detector = ScriptDetector(config.language_rules)
+        self.owner_extractor = OwnerExtractor(config.excluded_handles)
+        self.suppression = SuppressionIndex(self.store, config.suppression_files,
+                                            config.suppression_bloom_error_rate)
+        self.cooldown = CooldownIndex(self.store, config.cooldown_days * 86400)
+        self.dialogs = DialogIndex()
+        self.history_cached = 0
+        self.history_fetched = 0
+        self.graph = RecommendationGraph(self.store, ttl=config.graph_ttl_days * 86400)
+        self.posts = PostCache(self.store, ttl=config.post_cache_ttl_hours * 3600, size=config.post_cache_size)
+        self.keywords = KeywordMatcher(config.keywords)
+        # Keyword relevance of channels between lookup and expansion
+        self.relevance = {}
+        self.pruned = 0
+        self.budget = CrawlBudget(self.limiter, config.budget_api_calls, config.budget_minutes * 60,
+                                  config.budget_per_kind)
+        self.budget_stopped = False
+        self.lang_cache_hits = 0
+        self.lang_cache_misses = 0
+        self.posts_skipped = 0
+        self.limiter.load_rates(json.loads(self.store.get_meta('learned_rates', '{}')))
+        if config.trace_file:
+            self.enable_tracing(config.trace_file)
+    
+    # Phases shown as spans when tracing is on (API calls and sleeps are traced separately)
+    TRACED_METHODS = {
+        'process_channel': 'process_channel',
+        'get_owners': 'owner_lookup',
+        'resolve': 'resolve',
+        'detect_language': 'language',
+        'detect_language_from_posts': 'posts',
+        'expand_channel': 'expand',
+        'get_similar_channels': 'recommendations',
+        'handle_owner': 'handle_owner',
+        'send_message': 'send',
+        'check_history_with_owner': 'history_check',
+        'load_dialogs': 'dialog_snapshot',
+        'get_dialogs_page': 'dialog_page',
+    }
+    
+    def enable_tracing(self, path):
+        if not self.tracer.enabled:
+            instrument(self, self.TRACED_METHODS)
+        self.tracer.enable(path)
+    
+    # ==================== LOGGING ====================
+    
+    def is_owner_in_cooldown(self, owner):
+        """Check if owner is in cooldown period"""
+        return self.cooldown.active(owner)
+    
+    def mark_as_sent(self, owner):
+        """Mark owner as sent"""
+        self.cooldown.mark(owner)
+    
+    # ==================== API ====================
+    
+    async def api(self, kind, func, *args, **kwargs):
+        """Run a Telegram API call through the shared rate limiter"""
+        return await self.limiter.call(kind, func, *args, **kwargs)
+    
+    async def get_entity(self, name):
+        return await self.api('get_entity', self.client.get_entity, name)
+    
+    async def resolve(self, name):
+        """Resolve username to entity through the shared cache"""
+        return await self.entities.resolve(self.get_entity, name)
+    
+    async def pause(self, seconds, reason):
+        """Fixed politeness sleep, visible in traces"""
+        with self.tracer.span(f'sleep:{reason}'):
+            await asyncio.sleep(seconds)
+    
+    # ==================== LANGUAGE DETECTION ====================
+    
+    def detect_language_from_about(self, about):
+        """Detect language from channel description"""
+        if not about:
+            return None
+        return self.lang_detector.detect(about)
+    
+    async def fetch_posts(self, ent, limit, min_id=0):
+        """Newest posts of a channel, only those after min_id"""
+        return await self.api('get_messages', self.client.get_messages, ent, limit=limit, min_id=min_id)
+    
+    async def detect_language_from_posts(self, channel_name, ent):
+        """Detect language from last posts (cached, refreshed with min_id when stale)"""
+        try:
+            return self.lang_detector.detect(await self.posts.texts(self.fetch_posts, channel_name, ent))
+        
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            return None
+    
+    async def detect_language(self, channel_name, ent, about):
+        """Cached verdict, else description, else posts (only when description is unclear)"""
+        lang = self.store.get_language(channel_name, self.config.language_cache_ttl_days * 86400)
+        if lang is not None:
+            self.lang_cache_hits += 1
+            return lang
+        self.lang_cache_misses += 1
+        
+        lang = self.detect_language_from_about(about)
+        source = 'about'
+        if lang is None:
+            lang = await self.detect_language_from_posts(channel_name, ent)
+            source = 'posts'
+        else:
+            self.posts_skipped += 1
+        
+        if lang is None:
+            # Undecided verdicts are not cached, the next run tries again
+            return 'EN'
+        
+        self.store.put_language(channel_name, lang, source)
+        return lang
+    
+    # ==================== SEARCH ====================
+    
+    async def get_owners(self, channel_name, entity=None):
+        """Get channel owners and language"""
+        try:
+            # Channels found via recommendations already carry their entity
+            ent = entity if entity is not None else await self.resolve(channel_name)
+            
+            try:
+                full = await self.api('full_channel', self.client, GetFullChannelRequest(ent))
+                about = full.full_chat.about or ''
+                title = getattr(ent, 'title', None)
+                if title is None and getattr(full, 'chats', None):
+                    title = getattr(full.chats[0], 'title', None)
+                self.store.save_channel(channel_name, title, about,
+                                        getattr(full.full_chat, 'participants_count', None))
+                if self.keywords:
+                    # Posts cached by an earlier run count too; none are fetched for scoring
+                    self.relevance[channel_name] = self.keywords.score(title, about,
+                                                                       self.posts.cached(channel_name))
+            except RateLimitExceeded:
+                raise
+            except Exception:
+                about = ''
+            
+            lang = await self.detect_language(channel_name, ent, about)
+            
+            # Ranked, deterministic: contact/admin lines first, no self/bot/service handles
+            with self.tracer.span('owner_extract'):
+                owners = self.owner_extractor.extract(about, channel_name)
+            
+            if owners:
+                return owners[0], lang
+            return None, lang
+        
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            return None, 'EN'
+    
+    async def get_similar_channels(self, channel_name):
+        """All similar channels (cached graph or Telegram API), as (username, entity, title); not cut to similar_limit"""
+        try:
+            cached = self.graph.neighbours(channel_name)
+            if cached is not None:
+                similar = []
+                for username, peer, title in cached:
+                    if username not in self.processed_channels:
+                        if peer is not None:
+                            self.entities.put(username, peer)
+                        similar.append((username, peer, title))
+                return similar
+            
+            ent = await self.resolve(channel_name)
+            result = await self.api('recommendations', self.client, GetChannelRecommendationsRequest(channel=ent))
+            self.graph.record(channel_name, result.chats)
+            
+            similar = []
+            for ch in result.chats:
+                username = getattr(ch, 'username', None)
+                if username and username not in self.processed_channels:
+                    # Response already has id + access hash: no resolve needed later
+                    self.entities.put(username, ch)
+                    similar.append((username, ch, getattr(ch, 'title', None)))
+            
+            return similar
+        
+        except RateLimitExceeded:
+            # Never drop a subtree silently: the crawl stops and --resume retries it
+            raise
+        except Exception:
+            return []
+    
+    # ==================== HISTORY CHECK ====================
+    
+    async def get_dialogs_page(self, limit, offset_date=None, offset_id=0, offset_peer=None):
+        """One page of dialogs (one API call) after the given offset"""
+        kwargs = {'offset_peer': offset_peer} if offset_peer is not None else {}
+        return await self.api('dialogs', self.client.get_dialogs, limit=limit, offset_date=offset_date,
+                              offset_id=offset_id, **kwargs)
+    
+    async def load_dialogs(self):
+        """Snapshot all private chats once, then follow new messages"""
+        limit = self.config.dialog_snapshot_limit or None
+        try:
+            count = await self.dialogs.snapshot(self.get_dialogs_page, limit)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            # History checks fall back to fetching messages per owner
+            self.events.emit('dialogs', error=type(e).__name__)
+            return
+        add_handler = getattr(self.client, 'add_event_handler', None)
+        if add_handler is not None:
+            add_handler(self.dialogs.on_message, events.NewMessage())
+        self.events.emit('dialogs', dialogs=count, chats=len(self.dialogs), complete=self.dialogs.complete,
+                         seconds=round(self.dialogs.load_seconds, 3))
+    
+    async def check_history_with_owner(self, owner):
+        """Check conversation history with owner: (should_send, messages to delete, replied to us)"""
+        if self.dialogs.ready:
+            chat = self.dialogs.lookup(owner)
+            if chat is None and self.dialogs.complete:
+                # Never talked: nothing to check or delete
+                self.history_cached += 1
+                return True, [], False
+            if chat is not None:
+                peer_id, access_hash, out, _ = chat
+                if not out:
+                    # They wrote last; a reply to us only if we saw our message before theirs
+                    self.history_cached += 1
+                    return False, [], self.dialogs.replied(peer_id)
+                # We wrote last: messages are still needed to delete them, the username lookup is not
+                if access_hash is not None:
+                    self.entities.put(owner, InputPeerUser(peer_id, access_hash))
+        self.history_fetched += 1
+        try:
+            user = await self.resolve(owner)
+            messages = await self.api('get_messages', self.client.get_messages, user, limit=30)
+            
+            my_messages_to_delete = [msg for msg in messages if msg.out]
+            
+            if messages and not messages[0].out:
+                # Newest first: any message of ours is older than their last one
+                return False, [], bool(my_messages_to_delete)
+            
+            return True, my_messages_to_delete, False
+        
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            return True, [], False
+    
+    # ==================== SENDING ====================
+    
+    async def send_message(self, owner, lang):
+        """Send message to owner"""
+        try:
+            # Language filter
+            if self.config.target_language != 'BOTH':
+                if lang != self.config.target_language:
+                    return f'lang_skip_{lang}'
+            
+            # Bot filter - skip accounts ending with "bot"
+            if owner.lower().endswith('bot'):
+                return 'bot_skipped'
+            
+            # Cooldown check
+            if self.is_owner_in_cooldown(owner):
+                return 'cooldown'
+            
+            should_send, old_messages, replied = await self.check_history_with_owner(owner)
+            
+            if not should_send:
+                if replied:
+                    # They answered us: never message them again, and no history check next time
+                    self.suppression.add(owner, 'replied')
+                return 'skipped'
+            
+            # Delete old messages
+            if old_messages:
+                try:
+                    user = await self.resolve(owner)
+                    for old_msg in old_messages:
+                        try:
+                            await self.api('delete_messages', self.client.delete_messages, user, old_msg)
+                        except RateLimitExceeded:
+                            raise
+                        except Exception:
+                            try:
+                                await self.api('delete_messages', self.client.delete_messages, user, [old_msg.id])
+                            except RateLimitExceeded:
+                                raise
+                            except Exception:
+                                pass
+                    await self.pause(0.5, 'after_delete')
+                except RateLimitExceeded:
+                    raise
+                except Exception:
+                    pass
+            
+            # Send message
+            message = self.config.msg_ru if lang == 'RU' else self.config.msg_en
+            user = await self.resolve(owner)
+            
+            async def _send():
+                await asyncio.wait_for(
+                    self.client.send_message(user, message, link_preview=False),
+                    timeout=15
+                )
+            await self.api('send_message', _send)
+            
+            self.dialogs.note(utils.get_peer_id(user), True, time.time(), (owner,),
+                              getattr(user, 'access_hash', None))
+            self.mark_as_sent(owner)
+            self.sent_count += 1
+            
+            await self.pause(self.config.send_delay_seconds, 'send_delay')
+            
+            return 'sent'
+        
+        except asyncio.TimeoutError:
+            self.error_count += 1
+            return 'timeout'
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            self.error_count += 1
+            return 'error'
+    
+    # ==================== PROCESSING ====================
+    
+    async def handle_owner(self, channel_name, owner, lang, send=True, depth=0):
+        """Send (or test) one found owner, save the result and log the decision"""
+        if owner:
+            if self.suppression.check(owner):
+                # Do-not-contact: no history check, no resolve, no send
+                status = 'suppressed'
+            elif send:
+                status = await self.send_message(owner, lang)
+            else:
+                status = 'test'
+        else:
+            owner = 'NOT_FOUND'
+            status = 'no_owner'
+        
+        result = ResultRecord(channel_name, owner, lang, status)
+        self.tally.add(result)
+        self.metrics.inc('results_total', status=status)
+        self.events.emit('decision', channel=channel_name, depth=depth,
+                         owner=owner if status != 'no_owner' else None, lang=lang, status=status)
+        # Save ALL results - both successful and failed
+        self.save_result_incremental(result)
+        return status
+    
+    async def expand_channel(self, channel_name, depth):
+        """Queue similar channels of one channel by keyword priority, returns how many were found"""
+        parent_score = self.relevance.pop(channel_name, 0)
+        if not self.config.similar_limit:
+            return 0
+        # Budget planning: no recommendations call if the queue already fills the budget
+        limit = self.budget.fanout(len(self.frontier), self.config.similar_limit)
+        if not limit:
+            # Owed to the subtree: --resume expands this channel
+            self.frontier.defer(channel_name, depth, parent_score, expand_score=parent_score)
+            self.events.emit('expand', channel=channel_name, depth=depth, found=0, queued=0,
+                             budget_skipped=True)
+            return 0
+        
+        similar = await self.get_similar_channels(channel_name)
+        candidates = []
+        pruned = 0
+        for sim, sim_entity, sim_title in similar:
+            # Queued even past max_sent, so --resume keeps this subtree
+            if sim not in self.processed_channels:
+                priority = self.keywords.priority(sim_title, parent_score)
+                if self.keywords and priority < self.config.keyword_min_score:
+                    pruned += 1
+                    continue
+                candidates.append((sim, sim_entity, priority))
+        self.pruned += pruned
+        
+        # similar_limit applies after scoring: the best matches, wherever Telegram ranked them
+        candidates.sort(key=lambda c: -c[2])
+        candidates = candidates[:self.config.similar_limit]
+        for sim, sim_entity, priority in candidates[:limit]:
+            self.frontier.push(sim, depth + 1, sim_entity, priority)
+        # Children the budget has no room for wait in the checkpoint
+        for sim, _, priority in candidates[limit:]:
+            self.frontier.defer(sim, depth + 1, priority)
+        self.events.emit('expand', channel=channel_name, depth=depth, found=len(similar),
+                         queued=min(len(candidates), limit), deferred=max(len(candidates) - limit, 0),
+                         pruned=pruned)
+        return len(similar)
+    
+    async def try_expand(self, channel_name, depth):
+        """expand_channel, logging errors instead of raising them (flood waits still stop the crawl)"""
+        try:
+            await self.expand_channel(channel_name, depth)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            self.events.emit('expand', channel=channel_name, depth=depth, error=type(e).__name__)
+    
+    async def expand_deferred(self, channel_name, depth, score):
+        """Expansion a budget-limited run deferred; the channel itself is already processed"""
+        self.relevance[channel_name] = score
+        try:
+            await self.try_expand(channel_name, depth)
+        finally:
+            self.relevance.pop(channel_name, None)
+    
+    async def process_channel(self, channel_name, depth=0, send=True, max_sent=50, entity=None):
+        """Process channel"""
+        if self.sent_count >= max_sent:
+            return
+        
+        if channel_name in self.processed_channels or depth > self.config.max_depth:
+            return
+        
+        self.processed_channels.add(channel_name)
+        
+        owner, lang = await self.get_owners(channel_name, entity)
+        self.events.emit('channel', channel=channel_name, depth=depth, owner=owner, lang=lang,
+                         score=self.relevance.get(channel_name, 0))
+        
+        # "No owner found" is saved as well
+        await self.handle_owner(channel_name, owner, lang, send, depth)
+        
+        # Recursion
+        if depth < self.config.max_depth:
+            await self.try_expand(channel_name, depth)
+        self.relevance.pop(channel_name, None)
+        
+        # Recorded last, so a channel interrupted half-way is redone on --resume
+        self.store.add_processed(channel_name, depth, self.frontier.crawl_id)
+        self.budget.channel_done()
+        
+        await self.pause(self.config.channel_delay_seconds, 'channel_delay')
+    
+    # ==================== PIPELINE ====================
+    
+    async def discovery_worker(self, owners, state):
+        """Take channels from the frontier, find owner + similar channels"""
+        while not state['stop']:
+            async with state['cond']:
+                await state['cond'].wait_for(
+                    lambda: self.frontier or state['in_flight'] == 0 or state['stop']
+                )
+                if not state['stop'] and self.budget_reached():
+                    state['stop'] = True
+                if state['stop'] or not self.frontier:
+                    # Frontier empty and nobody left who could refill it
+                    state['cond'].notify_all()
+                    return
+                seq, channel_name, depth, entity, expand_score = self.frontier.pop()
+                if expand_score is None:
+                    if channel_name in self.processed_channels or depth > self.config.max_depth:
+                        self.frontier.done(seq)
+                        continue
+                    self.processed_channels.add(channel_name)
+                state['in_flight'] += 1
+            
+            try:
+                if expand_score is not None:
+                    # Owner already handled by the run that deferred this expansion
+                    await self.expand_deferred(channel_name, depth, expand_score)
+                    self.frontier.done(seq)
+                    continue
+                owner, lang = await self.get_owners(channel_name, entity)
+                self.events.emit('channel', channel=channel_name, depth=depth, owner=owner, lang=lang,
+                                 score=self.relevance.get(channel_name, 0))
+                if depth < self.config.max_depth:
+                    await self.try_expand(channel_name, depth)
+                await owners.put((seq, channel_name, depth, owner, lang))
+            finally:
+                self.relevance.pop(channel_name, None)
+                async with state['cond']:
+                    state['in_flight'] -= 1
+                    state['cond'].notify_all()
+    
+    async def owner_sender(self, owners, send, max_sent, state):
+        """Handle found owners one at a time, keeping the send delays"""
+        while True:
+            item = await owners.get()
+            if item is None:
+                return
+            seq, channel_name, depth, owner, lang = item
+            
+            await self.handle_owner(channel_name, owner, lang, send, depth)
+            
+            # Checkpoint only once the result is saved
+            self.store.add_processed(channel_name, depth, self.frontier.crawl_id)
+            self.frontier.done(seq)
+            self.budget.channel_done()
+            
+            if self.sent_count >= max_sent:
+                state['stop'] = True
+                async with state['cond']:
+                    state['cond'].notify_all()
+                return
+    
+    async def run_pipeline(self, send=False, max_sent=50, workers=None):
+        """Concurrent discovery workers feeding one sequential sender"""
+        workers = workers or self.config.discovery_workers
+        owners = asyncio.Queue(maxsize=workers * 4)
+        self.owner_queue = owners
+        state = {'cond': asyncio.Condition(), 'in_flight': 0, 'stop': False}
+        
+        sender = asyncio.create_task(self.owner_sender(owners, send, max_sent, state), name='sender')
+        worker_tasks = [
+            asyncio.create_task(self.discovery_worker(owners, state), name=f'discovery-{i}')
+            for i in range(workers)
+        ]
+        
+        discovery = asyncio.gather(*worker_tasks)
+        try:
+            done, _ = await asyncio.wait([sender, discovery], return_when=asyncio.FIRST_COMPLETED)
+            if sender not in done:
+                # Let the sender finish owners already found, even if a worker failed
+                await owners.put(None)
+                await sender
+            if sender.exception():
+                raise sender.exception()
+            if discovery.done() and not discovery.cancelled() and discovery.exception():
+                raise discovery.exception()
+        finally:
+            # Items not handled yet stay in the frontier checkpoint for --resume.
+            # stop first: a worker between awaits leaves its loop instead of taking more work
+            state['stop'] = True
+            discovery.cancel()
+            # Awaiting the gather (not just the workers) also reads its error
+            await asyncio.gather(discovery, return_exceptions=True)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+    
+    def budget_reached(self):
+        """True (and logged once) when a budget limit is used up"""
+        reason = self.budget.exhausted()
+        if reason:
+            self.budget_stop(f"{reason} limit reached")
+        return reason is not None
+    
+    def budget_stop(self, detail):
+        """Log the budget stop event, once per run"""
+        if not self.budget_stopped:
+            self.budget_stopped = True
+            self.events.emit('stop', reason='budget', detail=detail)
+    
+    # ==================== SAVING ====================
+    
+    def save_result_incremental(self, result):
+        """Queue result for the journal writer (flushed in background)"""
+        with self.tracer.span('result_save'):
+            self.journal.append(result)
+    
+    def export_results(self):
+        """Rebuild contacts.xlsx (all columns) from the state store in one streaming pass"""
+        if not self.config.export_xlsx_on_exit:
+            return
+        # A run without new results would only rewrite the same file
+        if not self.tally.total and os.path.exists(DATA_FILE):
+            return
+        try:
+            write_xlsx(self.store.iter_results(), DATA_FILE)
+        except Exception as e:
+            print(f"[ERROR] Excel export failed: {e}")
+    
+    # ==================== MAIN LOOP ====================
+    
+    async def run(self, send=True, max_sent=50, resume=False):
+        """Main loop"""
+        self.journal.start()
+        self.events.start()
+        self.metrics.start()
+        self.budget.start()
+        self.suppression.load()
+        self.cooldown.load()
+        
+        resumed = resume and self.frontier.resume()
+        if resumed:
+            self.processed_channels.reset(self.frontier.visited())
+        else:
+            self.processed_channels.reset()
+            self.frontier.start(self.config.seed_channels)
+        self.events.emit('crawl_start', crawl_id=self.frontier.crawl_id, mode='send' if send else 'discover',
+                         resume_requested=resume, resumed=resumed, queued=len(self.frontier),
+                         processed=len(self.processed_channels))
+        
+        try:
+            if send and self.config.dialog_snapshot:
+                await self.load_dialogs()
+            if not send and self.config.discovery_workers > 1:
+                await self.run_pipeline(send=send, max_sent=max_sent, workers=self.config.discovery_workers)
+            
+            while self.frontier and self.sent_count < max_sent:
+                if self.budget_reached():
+                    break
+                seq, channel_name, depth, entity, expand_score = self.frontier.pop()
+                
+                if expand_score is not None:
+                    await self.expand_deferred(channel_name, depth, expand_score)
+                elif channel_name not in self.processed_channels:
+                    await self.process_channel(channel_name, depth, send=send, max_sent=max_sent, entity=entity)
+                
+                # Checkpoint only after children are queued, so a crash re-runs this channel
+                self.frontier.done(seq)
+        except RateLimitExceeded as e:
+            self.events.emit('stop', reason='flood_wait', kind=e.kind, seconds=e.seconds,
+                             detail=f"Telegram asks to wait: {e}")
+            return
+        finally:
+            self.store.set_meta('learned_rates', json.dumps(self.limiter.learned_rates()))
+            # Progress lines are complete before the summary is printed
+            await self.events.flush()
+        
+        if self.frontier.complete():
+            self.frontier.finish()
+            self.events.emit('crawl_end', crawl_id=self.frontier.crawl_id, channels=len(self.processed_channels))
+            await self.events.flush()
+        elif not self.frontier:
+            # Queue drained only because the budget deferred the rest: the crawl stays open
+            self.budget_stop(f"{self.frontier.deferred} deferred channels / expansions left for --resume")
+            await self.events.flush()
+    
+    def collect_metrics(self, metrics):
+        """Cache counters and queue depths, refreshed before each metrics write"""
+        cache = self.entities.stats()
+        metrics.set_total('cache_hits_total', cache['hits'], cache='entity')
+        metrics.set_total('cache_hits_total', cache['disk_hits'], cache='entity_disk')
+        metrics.set_total('cache_misses_total', cache['misses'], cache='entity')
+        metrics.set_total('cache_hits_total', self.graph.hits, cache='graph')
+        metrics.set_total('cache_misses_total', self.graph.misses, cache='graph')
+        metrics.set_total('cache_hits_total', self.history_cached, cache='dialogs')
+        metrics.set_total('cache_misses_total', self.history_fetched, cache='dialogs')
+        metrics.set_total('cache_hits_total', self.lang_cache_hits, cache='language')
+        metrics.set_total('cache_misses_total', self.lang_cache_misses, cache='language')
+        metrics.set('queue_depth', len(self.frontier), queue='frontier')
+        metrics.set('queue_depth', len(self.journal.buffer), queue='journal')
+        if self.owner_queue is not None:
+            metrics.set('queue_depth', self.owner_queue.qsize(), queue='owners')
+    
+    async def close(self):
+        await self.events.close()
+        await self.metrics.close()
+        with self.tracer.span('journal_flush'):
+            await self.journal.close()
+        with self.tracer.span('export_xlsx'):
+            await asyncio.get_running_loop().run_in_executor(None, self.export_results)
+        try:
+            self.tracer.write()
+        except OSError as e:
+            print(f"[ERROR] Trace export failed: {e}")
+        self.processed_channels.flush()
+        self.store.close()
+        remove_handler = getattr(self.client, 'remove_event_handler', None)
+        if remove_handler is not None and self.dialogs.ready:
+            remove_handler(self.dialogs.on_message)
+        await self.client.disconnect()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crawl budget scheduler
+A budget in API calls, wall-clock minutes and/or calls per request type.
+Calls are read from the shared rate limiter's counters, so every
+Telegram call counts. From the observed cost per channel the scheduler
+estimates how many more channels fit and limits fan-out so the queue
+never holds more channels than the budget can process. Channels whose
+children could not be processed anyway are left for --resume to expand;
+an empty queue always gets one child, so every run makes progress. A
+limit on "recommendations" only stops expansion; the queue is still
+drained.
+"""
+
+import time
+
+# Expected calls per channel before anything is measured
+PRIOR_COST = {'full_channel': 1.0, 'recommendations': 1.0, 'get_messages': 0.5, 'get_entity': 0.2}
+PRIOR_SECONDS = 2.0
+
+# The call that expands a channel; queued channels may never need it
+EXPAND_KIND = 'recommendations'
+
+
+class CrawlBudget:
+    def __init__(self, limiter, max_calls=0, max_seconds=0, per_kind=None):
+        self.limiter = limiter
+        self.max_calls = max_calls or 0
+        self.max_seconds = max_seconds or 0
+        self.per_kind = {k: v for k, v in (per_kind or {}).items() if v}
+        self.started = time.monotonic()
+        self.base = {}
+        self.channels = 0
+        self.skipped_expansions = 0
+
+    def __bool__(self):
+        """True if any limit is set"""
+        return bool(self.max_calls or self.max_seconds or self.per_kind)
+
+    def start(self):
+        """Count from now on (earlier calls of this process are not charged)"""
+        self.started = time.monotonic()
+        self.base = dict(self.limiter.calls)
+        self.channels = 0
+
+    def used(self, kind=None):
+        if kind is not None:
+            return self.limiter.calls.get(kind, 0) - self.base.get(kind, 0)
+        return self.limiter.total_calls() - sum(self.base.values())
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def channel_done(self):
+        self.channels += 1
+
+    def exhausted(self):
+        """Name of the first limit reached, None while there is budget left"""
+        if self.max_calls and self.used() >= self.max_calls:
+            return 'api_calls'
+        if self.max_seconds and self.elapsed() >= self.max_seconds:
+            return 'time'
+        for kind, limit in self.per_kind.items():
+            if kind != EXPAND_KIND and self.used(kind) >= limit:
+                return kind
+        return None
+
+    def cost(self, kind=None):
+        """Average calls per channel so far (prior estimate before the first channel)"""
+        if self.channels:
+            return self.used(kind) / self.channels
+        if kind is None:
+            return sum(PRIOR_COST.values())
+        return PRIOR_COST.get(kind, 0.0)
+
+    def leaf_cost(self):
+        """Calls per channel without its expansion"""
+        return max(self.cost() - self.cost(EXPAND_KIND), 0.01)
+
+    def capacity(self):
+        """Estimated number of (unexpanded) channels that still fit into every limit"""
+        left = []
+        if self.max_calls:
+            left.append((self.max_calls - self.used()) / self.leaf_cost())
+        if self.max_seconds:
+            per_channel = self.elapsed() / self.channels if self.channels else PRIOR_SECONDS
+            left.append((self.max_seconds - self.elapsed()) / max(per_channel, 0.01))
+        for kind, limit in self.per_kind.items():
+            cost = self.cost(kind)
+            if kind != EXPAND_KIND and cost > 0:
+                left.append((limit - self.used(kind)) / cost)
+        if not left:
+            return float('inf')
+        return max(0, int(min(left)))
+
+    def fanout(self, queued, limit):
+        """How many children of one channel are worth queueing (0 = defer the expansion)"""
+        if not self or not limit:
+            return limit
+        expand_limit = self.per_kind.get(EXPAND_KIND)
+        if expand_limit and self.used(EXPAND_KIND) >= expand_limit:
+            self.skipped_expansions += 1
+            return 0
+        # One call for the expansion itself
+        room = self.capacity() - queued - 1
+        if room <= 0 and not queued:
+            # Nothing else left to run: one child keeps the crawl moving
+            room = 1
+        if room <= 0:
+            self.skipped_expansions += 1
+            return 0
+        return min(limit, room)
+
+    def report(self):
+        """Lines of used / limit / left for every limit set"""
+        lines = []
+        if self.max_calls:
+            used = self.used()
+            lines.append(f"API calls: {used}/{self.max_calls} ({max(0, self.max_calls - used)} left)")
+        if self.max_seconds:
+            spent = self.elapsed()
+            lines.append(f"Time: {spent / 60:.1f}/{self.max_seconds / 60:.1f} min "
+                         f"({max(0, self.max_seconds - spent) / 60:.1f} left)")
+        for kind, limit in self.per_kind.items():
+            used = self.used(kind)
+            lines.append(f"{kind}: {used}/{limit} ({max(0, limit - used)} left)")
+        if self.channels:
+            lines.append(f"Cost: {self.cost():.2f} calls/channel over {self.channels} channels, "
+                         f"~{self.capacity()} more channels fit")
+        if self.skipped_expansions:
+            lines.append(f"Expansions skipped to stay in budget: {self.skipped_expansions}")
+        return lines
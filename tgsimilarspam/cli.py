@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command line
+python -m tgsimilarspam {discover,send,export,stats,suppress}. Only argparse and
+the config module load up front; Telethon, the bot and the export
+writers are imported inside the command that needs them, so --help, stats and export
+start without paying for them.
+"""
+
+import argparse
+import os
+import sys
+
+from .config import Config, ConfigError, CONFIG_FILE, DATA_FILE, STATE_DB_FILE
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default=CONFIG_FILE, metavar='FILE',
+                        help=f'settings file (default: {CONFIG_FILE})')
+
+    crawl = argparse.ArgumentParser(add_help=False, parents=[common])
+    crawl.add_argument('--resume', action='store_true',
+                       help='continue the last unfinished crawl instead of starting from seed channels')
+    crawl.add_argument('--budget-calls', type=int,
+                       help='stop after this many Telegram API calls (overrides budget_api_calls)')
+    crawl.add_argument('--budget-minutes', type=float,
+                       help='stop after this many minutes (overrides budget_minutes)')
+    crawl.add_argument('--record', metavar='FILE',
+                       help='save API answers to a JSONL fixture file for offline replay')
+    crawl.add_argument('--trace', metavar='FILE',
+                       help='write a Chrome/Perfetto trace of the run (open in ui.perfetto.dev)')
+
+    parser = argparse.ArgumentParser(prog='tgsimilarspam', description='TGSimilarSpam bot')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+    commands.add_parser('discover', parents=[crawl],
+                        help='only crawl and record owners, do not send messages')
+    commands.add_parser('send', parents=[crawl], help='crawl and message found owners')
+    export = commands.add_parser('export', help=f'write results from {STATE_DB_FILE} (default: rebuild {DATA_FILE})')
+    export.add_argument('--output', default=DATA_FILE, metavar='FILE')
+    export.add_argument('--format', choices=['xlsx', 'csv', 'jsonl', 'parquet'],
+                        help='default: from the --output extension (parquet needs pyarrow)')
+    export.add_argument('--status', nargs='+', metavar='STATUS', help='only these statuses (sent, test, ...)')
+    export.add_argument('--lang', nargs='+', metavar='LANG', help='only these languages (RU, EN, ...)')
+    export.add_argument('--since', metavar='DATE', help='only results from this date (YYYY-MM-DD[ HH:MM])')
+    export.add_argument('--until', metavar='DATE', help='only results up to this date, inclusive')
+    export.add_argument('--incremental', action='store_true',
+                        help='only results added since the last --incremental export to the same file '
+                             '(appended to CSV / JSONL, a new timestamped file for xlsx / Parquet)')
+    commands.add_parser('stats', parents=[common], help=f'show what {STATE_DB_FILE} holds (and the last run)')
+    suppress = commands.add_parser('suppress', help='add handles to the do-not-contact list')
+    suppress.add_argument('handles', nargs='*', metavar='HANDLE')
+    suppress.add_argument('--file', metavar='FILE', help='one handle per line')
+    suppress.add_argument('--reason', default='opt_out')
+    suppress.add_argument('--remove', action='store_true', help='take the handles off the list')
+    return parser
+
+
+# ==================== CRAWL ====================
+
+async def run_bot(config, send=True, resume=False, budget_calls=None, budget_minutes=None,
+                  record=None, trace=None):
+    """Connect, crawl (and send), print the summary; returns the exit code"""
+    from .bot import TelegramBDBot
+
+    bot = None
+    try:
+        # Inside the try: an unreadable state.db or session is reported like any other error
+        bot = TelegramBDBot(config)
+        if trace:
+            bot.enable_tracing(trace)
+        if record:
+            # Save API answers as fixtures for telegram_replay.ReplayClient
+            from .telegram_replay import RecordingClient
+            bot.client = RecordingClient(bot.client, record)
+        if budget_calls is not None:
+            bot.budget.max_calls = budget_calls
+        if budget_minutes is not None:
+            bot.budget.max_seconds = budget_minutes * 60
+
+        print("[*] Connecting...")
+        await bot.client.connect()
+
+        if not await bot.client.is_user_authorized():
+            print("[ERROR] Not authorized. Run setup.py first!")
+            return 1
+
+        me = await bot.client.get_me()
+        print(f"[OK] {me.first_name}\n")
+
+        print(f"[*] MODE: {'SEND' if send else 'DISCOVER'}")
+        print(f"    Seed channels: {len(config.seed_channels)}")
+        print(f"    Keywords: {', '.join(config.keywords[:3])}...")
+        print(f"    Target language: {config.target_language}")
+        print(f"    Max messages: {config.max_sent_per_run}")
+        if bot.budget:
+            print(f"    Budget: {bot.budget.max_calls or '-'} API calls, "
+                  f"{bot.budget.max_seconds / 60 or '-'} min, per type {bot.budget.per_kind or '-'}")
+        print()
+
+        await bot.run(send=send, max_sent=config.max_sent_per_run, resume=resume)
+
+        print(f"\n{'='*70}")
+        print("[RESULTS]")
+        print(f"  Contacts found: {bot.tally.owners} in {bot.tally.total} channels ({bot.tally.summary() or '-'})")
+        print(f"  Messages sent: {bot.sent_count}")
+        print(f"  Errors: {bot.error_count}")
+        print(f"  API calls: {bot.limiter.total_calls()}")
+        print(f"  Language: {bot.lang_cache_hits} cached, {bot.posts_skipped} decided by description")
+        print(f"  Recommendations: {bot.graph.hits} from graph cache, {bot.graph.misses} fetched")
+        print(f"  Posts: {bot.posts.hits} from cache, {bot.posts.refreshed} refreshed with min_id "
+              f"({bot.posts.unchanged} unchanged), {bot.posts.fetched} fetched")
+        if bot.keywords:
+            print(f"  Keyword pruning: {bot.pruned} channels below score {config.keyword_min_score}")
+        if bot.limiter.flood_seconds:
+            print(f"  Flood waits: {sum(bot.limiter.flood_waits.values())} "
+                  f"({bot.limiter.flood_seconds}s total)")
+        print(f"  Learned rates (calls/s): {bot.limiter.learned_rates()}")
+        if bot.budget:
+            print("  Budget:")
+            for line in bot.budget.report():
+                print(f"    {line}")
+            if bot.frontier.deferred:
+                print(f"    Deferred to --resume: {bot.frontier.deferred} channels / expansions")
+        if bot.dialogs.ready:
+            print(f"  History checks: {bot.history_cached} from dialog snapshot ({len(bot.dialogs)} chats, "
+                  f"{bot.dialogs.updates} updates), {bot.history_fetched} fetched")
+        print(f"  Cooldown: {len(bot.cooldown)} owners active, {bot.cooldown.pruned} expired rows pruned "
+              f"(loaded in {bot.cooldown.load_seconds:.2f}s)")
+        print(f"  Suppressed: {bot.suppression.hits} owners skipped ({bot.suppression.summary()})")
+        print(f"  Visited: {bot.processed_channels.summary()}")
+        cache = bot.entities.stats()
+        print(f"  Entity cache: {cache['hits']} hits, {cache['disk_hits']} disk hits, "
+              f"{cache['misses']} misses ({cache['hit_rate']}% hit rate)")
+        if config.metrics_summary_file:
+            print(f"  Metrics: {config.metrics_file or '-'} (Prometheus), "
+                  f"{config.metrics_summary_file} (summary at exit)")
+        if bot.tracer.enabled:
+            print(f"  Trace: {bot.tracer.path} ({len(bot.tracer.events)} events)")
+        print(f"{'='*70}\n")
+        return 0
+
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    finally:
+        if bot is not None:
+            await bot.close()
+
+
+def cmd_crawl(args):
+    try:
+        config = Config.load(args.config)
+        if args.command == 'send':
+            config.require_messages()
+    except ConfigError as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    import asyncio
+    return asyncio.run(run_bot(config, send=args.command == 'send', resume=args.resume,
+                               budget_calls=args.budget_calls, budget_minutes=args.budget_minutes,
+                               record=args.record, trace=args.trace))
+
+
+# ==================== OFFLINE COMMANDS ====================
+
+def open_store(create=False):
+    """Existing state.db, or None (only creates an empty one if asked)"""
+    if not create and not os.path.exists(STATE_DB_FILE):
+        print(f"[ERROR] {STATE_DB_FILE} not found. Run the bot first!")
+        return None
+    from .state_store import StateStore
+    return StateStore(STATE_DB_FILE)
+
+
+def cmd_export(args):
+    from .export import ExportError, export_results, format_for
+
+    try:
+        fmt = format_for(args.output, args.format)
+    except ExportError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    store = open_store()
+    if store is None:
+        return 1
+    try:
+        count, written = export_results(store, args.output, fmt, statuses=args.status, langs=args.lang,
+                               since=args.since, until=args.until, incremental=args.incremental)
+    except ExportError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    except Exception as e:
+        print(f"[ERROR] Export failed: {e}")
+        return 1
+    finally:
+        store.close()
+    print(f"[OK] {count} results -> {written}" + (' (new since last export)' if args.incremental else ''))
+    return 0
+
+
+def cmd_stats(args):
+    store = open_store()
+    if store is None:
+        return 1
+    try:
+        stats = store.stats()
+        crawl_id = store.get_meta('crawl_id')
+        finished = store.get_meta('crawl_finished')
+        rates = store.get_meta('learned_rates')
+    finally:
+        store.close()
+
+    by_status = ', '.join(f"{status} {count}" for status, count in stats['by_status'].items())
+    print(f"[*] {STATE_DB_FILE}")
+    print(f"    Results:      {stats['results']}" + (f" ({by_status})" if by_status else ''))
+    print(f"    Sent owners:  {stats['sent_log']}")
+    print(f"    Suppressed:   {stats['suppressed']} owners")
+    print(f"    Processed:    {stats['processed_channels']} channels")
+    if crawl_id:
+        state = 'finished' if finished else f"{stats['frontier']} queued (--resume continues it)"
+        print(f"    Last crawl:   #{crawl_id}, {state}")
+    print(f"    Caches:       {stats['channels']} channels, {stats['language_cache']} languages, "
+          f"{stats['posts']} posts of {stats['post_checks']} channels, {stats['entities']} entities")
+    print(f"    Graph:        {stats['graph_edges']} edges from {stats['graph_fetches']} channels")
+    if rates:
+        print(f"    Learned rates (calls/s): {rates}")
+    print_last_run(args.config)
+    return 0
+
+
+def print_last_run(config_path):
+    """Skip reasons and ending of the last run, from the events file"""
+    from .event_log import last_run
+
+    try:
+        config = Config.load(config_path)
+    except ConfigError:
+        config = Config()
+    if not config.events_file or not os.path.exists(config.events_file):
+        return
+    statuses, ending = last_run(config.events_file)
+    decisions = ', '.join(f"{status} {count}" for status, count in
+                          sorted(statuses.items(), key=lambda item: -item[1]))
+    print(f"    Last run:     {decisions or 'no decisions'}" + (f" ({ending})" if ending else ''))
+
+
+def cmd_suppress(args):
+    from .suppression import normalize_handle, iter_handles
+
+    handles = [normalize_handle(h) for h in args.handles]
+    if args.file:
+        if not os.path.exists(args.file):
+            print(f"[ERROR] {args.file} not found")
+            return 1
+        handles.extend(iter_handles(args.file))
+    handles = [h for h in dict.fromkeys(handles) if h]
+    if not handles:
+        print("[ERROR] No handles given")
+        return 1
+
+    store = open_store(create=True)
+    try:
+        if args.remove:
+            removed = store.remove_suppressed(handles)
+            print(f"[OK] {removed} handles removed from the do-not-contact list")
+        else:
+            store.add_suppressed((h, args.reason) for h in handles)
+            print(f"[OK] {len(handles)} handles suppressed ({args.reason}), "
+                  f"{store.count_suppressed()} in total")
+    finally:
+        store.close()
+    return 0
+
+
+COMMANDS = {
+    'discover': cmd_crawl,
+    'send': cmd_crawl,
+    'export': cmd_export,
+    'stats': cmd_stats,
+    'suppress': cmd_suppress,
+}
+
+
+def main(argv=None):
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration
+config.json is loaded into a Config object on demand (no work at import
+time), with a default for every setting. Missing or broken files raise
+ConfigError for the CLI to report, instead of exiting the process.
+"""
+
+import json
+import os
+
+CONFIG_FILE = 'config.json'
+SENT_LOG_FILE = 'sent_log.json'
+DATA_FILE = 'contacts.xlsx'
+RESULTS_JOURNAL_FILE = 'results.jsonl'
+STATE_DB_FILE = 'state.db'
+
+# Every config.json key the bot reads, with its default
+DEFAULTS = {
+    # Credentials from config, or fallback to Telethon defaults
+    'api_id': 20190360,
+    'api_hash': '67029a9453eb8a1f64fcead2fb0195b3',
+    'phone': None,
+    'seed_channels': [],
+    'keywords': [],
+
+    'cooldown_days': 2,
+    'send_delay_seconds': 15,
+    'channel_delay_seconds': 1,
+    'max_sent_per_run': 50,
+    'target_language': 'BOTH',
+    'language_rules': None,  # None = default RU/EN rule
+    'language_cache_ttl_days': 7,
+    'post_cache_ttl_hours': 24,  # cached posts reused without a call; then min_id refresh
+    'post_cache_size': 5,
+    'excluded_handles': [],
+    'dialog_snapshot': True,  # history checks from one get_dialogs pass
+    'dialog_snapshot_limit': 0,  # 0 = all dialogs
+    'suppression_files': [],  # do-not-contact lists, one handle per line
+    'suppression_bloom_error_rate': 0,  # 0 = exact set
+
+    'max_depth': 2,
+    'similar_limit': 10,
+    'keyword_min_score': 0,
+    'graph_ttl_days': 7,
+    'visited_backend': 'set',  # 'set' or 'bloom' (multi-million-channel crawls)
+    'visited_bloom_capacity': 1000000,
+    'visited_bloom_error_rate': 0.001,
+
+    'entity_cache_size': 5000,
+    'entity_cache_ttl_hours': 24,
+    'entity_cache_persist': True,
+
+    'discovery_workers': 4,
+    'api_rate_per_second': 2.0,
+    'api_burst': 5,
+    'api_rates': {},
+    'flood_max_wait_seconds': 900,
+
+    'metrics_file': 'metrics.prom',
+    'metrics_summary_file': 'metrics.json',
+    'metrics_interval_seconds': 15,
+    'trace_file': '',  # '' = tracing off
+    'events_file': 'events.jsonl',
+    'events_max_mb': 50,  # 0 = never rotate
+    'events_backups': 3,
+    'console_progress': True,
+    'export_xlsx_on_exit': True,
+
+    # 0 / {} = no limit
+    'budget_api_calls': 0,
+    'budget_minutes': 0,
+    'budget_per_kind': {},
+
+    'msg_ru': '',
+    'msg_en': '',
+}
+
+
+class ConfigError(Exception):
+    pass
+
+
+class Config:
+    """Bot settings: every DEFAULTS key is an attribute (config.max_depth, ...)"""
+
+    def __init__(self, values=None, path=None):
+        self.path = path
+        # Unknown keys (interface_lang, ...) are kept for get()
+        self.values = dict(values or {})
+        for key, default in DEFAULTS.items():
+            setattr(self, key, self.values.get(key, default))
+
+    @classmethod
+    def load(cls, path=CONFIG_FILE):
+        if not os.path.exists(path):
+            raise ConfigError(f"{path} not found. Run setup.py first!")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                values = json.load(f)
+        except ValueError as e:
+            raise ConfigError(f"{path} is not valid JSON: {e}")
+        if not isinstance(values, dict):
+            raise ConfigError(f"{path} must contain a JSON object")
+        return cls(values, path)
+
+    def get(self, key, default=None):
+        if key in DEFAULTS:
+            return getattr(self, key)
+        return self.values.get(key, default)
+
+    def require_messages(self):
+        """Sending needs at least one message text"""
+        if not self.msg_ru and not self.msg_en:
+            raise ConfigError(f"No messages in {self.path or CONFIG_FILE}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cooldown index
+Owners messaged within the last cooldown_days, kept in memory as a dict
+owner -> expiry (epoch seconds) for O(1) checks, plus a min-heap by
+expiry so owners leave the index in order as their cooldown ends,
+without scanning. Sent log rows older than the cooldown are deleted from
+the state store on load.
+"""
+
+import heapq
+import sys
+import time
+
+
+class CooldownIndex:
+    def __init__(self, store=None, cooldown=2 * 86400):
+        self.store = store
+        self.cooldown = cooldown
+        self.expiry = {}
+        # (expiry, owner); an owner messaged again leaves a stale entry, skipped on pop
+        self.heap = []
+        self.pruned = 0
+        self.expired = 0
+        self.load_seconds = 0.0
+
+    def load(self, now=None):
+        """Drop expired rows from the store and load the active ones"""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        cutoff = now - self.cooldown
+        self.expiry = {}
+        self.heap = []
+        if self.store is not None:
+            # cooldown_days 0 switches the check off, it does not wipe the log
+            if self.cooldown > 0:
+                self.pruned = self.store.prune_sent(cutoff)
+            cooldown = self.cooldown
+            # Rows come oldest first: the list is already a valid heap
+            for owner, sent_at in self.store.load_sent_log(cutoff):
+                expires = sent_at + cooldown
+                self.expiry[owner] = expires
+                self.heap.append((expires, owner))
+        self.load_seconds = time.perf_counter() - started
+        return self
+
+    def prune(self, now=None):
+        """Remove owners whose cooldown has ended"""
+        now = time.time() if now is None else now
+        heap, expiry = self.heap, self.expiry
+        while heap and heap[0][0] <= now:
+            expires, owner = heapq.heappop(heap)
+            if expiry.get(owner) == expires:
+                del expiry[owner]
+                self.expired += 1
+
+    def active(self, owner, now=None):
+        """True if the owner was messaged less than the cooldown ago"""
+        now = time.time() if now is None else now
+        if self.heap and self.heap[0][0] <= now:
+            self.prune(now)
+        return owner in self.expiry
+
+    def mark(self, owner, now=None):
+        """Record a message sent now"""
+        now = time.time() if now is None else now
+        expires = now + self.cooldown
+        self.expiry[owner] = expires
+        heapq.heappush(self.heap, (expires, owner))
+        if self.store is not None:
+            self.store.mark_sent(owner, now)
+
+    def __len__(self):
+        return len(self.expiry)
+
+    def memory_bytes(self):
+        """Approximate memory: dict and heap tables, keys, expiry floats, heap tuples"""
+        size = sys.getsizeof(self.expiry) + sys.getsizeof(self.heap)
+        for owner, expires in self.expiry.items():
+            size += sys.getsizeof(owner) + sys.getsizeof(expires)
+        return size + len(self.heap) * sys.getsizeof((0.0, ''))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checkpointed crawl frontier
+Priority queue of (channel, depth) mirrored in the state store, so a
+crash, Ctrl-C or hitting max_sent keeps the frontier for the next
+--resume run. Highest keyword priority is popped first; equal priorities
+keep insertion order, so without keywords the crawl is a plain BFS.
+Entities returned by recommendations ride along in memory only; after a
+resume they come back from the entity cache. Work a crawl budget cut
+short (children not queued, expansions skipped) is deferred: written to
+the checkpoint only, so this run can end while --resume picks it up.
+"""
+
+import heapq
+
+
+class CrawlFrontier:
+    def __init__(self, store):
+        self.store = store
+        # Heap of (-priority, seq, channel, depth, entity, expand_score); seq breaks ties FIFO
+        self.queue = []
+        self.crawl_id = None
+        # Entries written to the checkpoint but not queued in this run
+        self.deferred = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def start(self, seeds):
+        """Start a new crawl from seed channels"""
+        self.crawl_id = self.store.new_crawl()
+        self.queue.clear()
+        self.deferred = 0
+        for ch in seeds:
+            self.push(ch, 0)
+
+    def resume(self):
+        """Load the frontier of the last unfinished crawl, False if none"""
+        crawl_id = self.store.get_meta('crawl_id')
+        if not crawl_id or self.store.get_meta('crawl_finished'):
+            return False
+
+        rows = self.store.load_frontier(int(crawl_id))
+        if not rows:
+            return False
+
+        self.crawl_id = int(crawl_id)
+        self.queue = [(-priority, seq, channel, depth, None, expand_score)
+                      for seq, channel, depth, priority, expand_score in rows]
+        self.deferred = 0
+        heapq.heapify(self.queue)
+        return True
+
+    def visited(self):
+        """Channels already processed by this crawl (an iterator, read in chunks)"""
+        return self.store.iter_processed(self.crawl_id)
+
+    def push(self, channel, depth, entity=None, priority=0.0):
+        seq = self.store.frontier_push(self.crawl_id, channel, depth, priority)
+        heapq.heappush(self.queue, (-priority, seq, channel, depth, entity, None))
+
+    def defer(self, channel, depth, priority=0.0, expand_score=None):
+        """Checkpoint an entry for the next --resume without queueing it now
+
+        expand_score (the channel's relevance) marks a processed channel whose
+        expansion is still owed.
+        """
+        self.store.frontier_push(self.crawl_id, channel, depth, priority, expand_score)
+        self.deferred += 1
+
+    def pop(self):
+        """Return best (seq, channel, depth, entity, expand_score); it stays on disk until done()"""
+        _, seq, channel, depth, entity, expand_score = heapq.heappop(self.queue)
+        return seq, channel, depth, entity, expand_score
+
+    def done(self, seq):
+        """Drop a processed entry from the checkpoint"""
+        self.store.frontier_remove(seq)
+
+    def complete(self):
+        """True when nothing is queued or deferred: the crawl is over"""
+        return not self.queue and not self.deferred
+
+    def finish(self):
+        """Mark crawl as complete, so --resume starts a new one"""
+        self.store.set_meta('crawl_finished', '1')
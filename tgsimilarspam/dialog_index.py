@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dialog snapshot index
+One paginated get_dialogs pass at startup records, for every private
+chat, who wrote the last message and when; new-message updates and our
+own sends keep it current. History checks become dict lookups: no chat
+means nothing to check, an incoming last message means skip (a reply
+only if an update showed it after our message), and only chats where we
+wrote last still need their messages fetched.
+"""
+
+import time
+
+DIALOG_PAGE_SIZE = 100
+
+
+def _epoch(date):
+    return date.timestamp() if date is not None else 0.0
+
+
+class DialogIndex:
+    def __init__(self):
+        # peer id -> (out, date) of the last message
+        self.last = {}
+        # lowercased username -> (peer id, access hash)
+        self.peers = {}
+        # Peers whose message came after one of ours while we were watching
+        self.replies = set()
+        self.ready = False
+        # False when the snapshot was cut by a limit: "no chat" is then not an answer
+        self.complete = False
+        self.updates = 0
+        self.load_seconds = 0.0
+
+    async def snapshot(self, fetch_page, limit=None):
+        """Build the index page by page (replaces any earlier snapshot)
+
+        fetch_page(limit, offset_date, offset_id, offset_peer) returns one page of
+        dialogs in a single API call, so each page is rate-limited (and retried
+        after a FloodWait) on its own.
+        """
+        started = time.perf_counter()
+        self.last, self.peers = {}, {}
+        self.replies = set()
+        seen = set()
+        offset = (None, 0, None)
+        complete = False
+        while limit is None or len(seen) < limit:
+            size = DIALOG_PAGE_SIZE if limit is None else min(DIALOG_PAGE_SIZE, limit - len(seen))
+            page = await fetch_page(size, *offset)
+            new = 0
+            for dialog in page:
+                if dialog.id in seen:
+                    continue
+                seen.add(dialog.id)
+                new += 1
+                self._add(dialog)
+            if len(page) < size:
+                complete = True
+                break
+            last = page[-1]
+            if not new or last.message is None:
+                # No way to page further: "no chat" is then not an answer
+                break
+            offset = (last.date, last.message.id, last.input_entity)
+        self.ready = True
+        self.complete = complete
+        self.load_seconds = time.perf_counter() - started
+        return len(seen)
+
+    def _add(self, dialog):
+        entity = dialog.entity
+        if not dialog.is_user or getattr(entity, 'is_self', False):
+            return
+        self.note(dialog.id, bool(getattr(dialog.message, 'out', False)), _epoch(dialog.date),
+                  usernames(entity), getattr(entity, 'access_hash', None))
+
+    def note(self, peer_id, out, date, names=(), access_hash=None):
+        """Record a message in a private chat, unless we already know a newer one"""
+        known = self.last.get(peer_id)
+        if known is None or known[1] <= date:
+            if known is not None and known[0] and not out:
+                self.replies.add(peer_id)
+            self.last[peer_id] = (out, date)
+        for name in names:
+            if name:
+                old = self.peers.get(name.lower())
+                if access_hash is None and old is not None:
+                    access_hash = old[1]
+                self.peers[name.lower()] = (peer_id, access_hash)
+
+    async def on_message(self, event):
+        """NewMessage update handler: keeps the snapshot current"""
+        if not event.is_private:
+            return
+        self.updates += 1
+        chat = event.chat
+        self.note(event.chat_id, bool(event.out), _epoch(event.date),
+                  usernames(chat) if chat is not None else (), getattr(chat, 'access_hash', None))
+
+    def lookup(self, username):
+        """(peer id, access hash, out, date) of the last message with username, None if no chat"""
+        peer = self.peers.get(username.lstrip('@').lower())
+        if peer is None:
+            return None
+        last = self.last.get(peer[0])
+        if last is None:
+            return None
+        return peer[0], peer[1], last[0], last[1]
+
+    def replied(self, peer_id):
+        """True if they wrote after our message (seen in an update, not in the snapshot)"""
+        return peer_id in self.replies
+
+    def __len__(self):
+        return len(self.last)
+
+
+def usernames(entity):
+    """Main username plus active collectible ones"""
+    names = [getattr(entity, 'username', None)]
+    for extra in getattr(entity, 'usernames', None) or ():
+        if getattr(extra, 'active', True):
+            names.append(extra.username)
+    return [name for name in names if name]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Entity resolution cache
+LRU + TTL cache in front of client.get_entity, keyed by lowercased
+username. Optionally persists input peers (id + access_hash) in the
+state store, so later runs skip the username resolve round-trip.
+"""
+
+import time
+from collections import OrderedDict
+
+from telethon import utils
+from telethon.tl.types import InputPeerChannel, InputPeerUser, InputPeerChat
+
+ENTITY_CACHE_SIZE = 5000
+ENTITY_CACHE_TTL_SECONDS = 24 * 3600
+
+
+def _peer_to_row(entity):
+    """Convert an entity into (kind, id, access_hash) for storage"""
+    try:
+        peer = utils.get_input_peer(entity)
+    except TypeError:
+        return None
+    if isinstance(peer, InputPeerChannel):
+        return 'channel', peer.channel_id, peer.access_hash
+    if isinstance(peer, InputPeerUser):
+        return 'user', peer.user_id, peer.access_hash
+    if isinstance(peer, InputPeerChat):
+        return 'chat', peer.chat_id, 0
+    return None
+
+
+def _row_to_peer(kind, peer_id, access_hash):
+    if kind == 'channel':
+        return InputPeerChannel(peer_id, access_hash)
+    if kind == 'user':
+        return InputPeerUser(peer_id, access_hash)
+    if kind == 'chat':
+        return InputPeerChat(peer_id)
+    return None
+
+
+class EntityCache:
+    def __init__(self, maxsize=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL_SECONDS, store=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name):
+        return str(name).lstrip('@').lower()
+
+    def get_cached(self, name):
+        """Return cached entity or None, without any network call"""
+        key = self.key(name)
+        entry = self.entries.get(key)
+        now = time.time()
+
+        if entry is not None:
+            entity, stored_at = entry
+            if now - stored_at < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entity
+            del self.entries[key]
+
+        if self.store is not None:
+            row = self.store.get_entity_row(key)
+            if row is not None and now - row[3] < self.ttl:
+                peer = _row_to_peer(row[0], row[1], row[2])
+                if peer is not None:
+                    self._remember(key, peer, row[3])
+                    self.disk_hits += 1
+                    return peer
+
+        return None
+
+    def put(self, name, entity):
+        """Cache a resolved entity (also written through to disk)"""
+        key = self.key(name)
+        now = time.time()
+        self._remember(key, entity, now)
+
+        if self.store is not None:
+            row = _peer_to_row(entity)
+            if row is not None:
+                self.store.put_entity_row(key, row[0], row[1], row[2], now)
+
+    def _remember(self, key, entity, stored_at):
+        self.entries[key] = (entity, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    async def resolve(self, fetch, name):
+        """Cached replacement for get_entity; fetch(name) does the real lookup"""
+        if not isinstance(name, str):
+            # Already an entity or input peer
+            return name
+
+        entity = self.get_cached(name)
+        if entity is not None:
+            return entity
+
+        self.misses += 1
+        entity = await fetch(name)
+        self.put(name, entity)
+        return entity
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        hit_rate = (self.hits + self.disk_hits) / lookups * 100 if lookups else 0.0
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(hit_rate, 1),
+            'size': len(self.entries),
+        }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structured event log
+The crawl emits one event per channel and per decision (found owner,
+send / skip reason, expansion, stop) instead of printing from inside the
+async flow. emit() only appends a dict to a buffer; a background task
+writes the events as JSONL (batched for a fraction of a second, in a
+worker thread) and renders each one as a single complete console line,
+so concurrent workers never interleave half-printed lines. The file is
+rotated by size (events.jsonl.1 ... .N).
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+# Console lag traded for fewer writes
+FLUSH_DELAY_SECONDS = 0.2
+
+STATUS_LABELS = {
+    'sent': '[SENT]',
+    'skipped': '[SKIPPED]',
+    'cooldown': '[COOLDOWN]',
+    'suppressed': '[SUPPRESSED]',
+    'bot_skipped': '[BOT]',
+    'lang_skip_RU': '[LANG_SKIP_RU]',
+    'lang_skip_EN': '[LANG_SKIP_EN]',
+    'timeout': '[TIMEOUT]',
+    'test': '[TEST]',
+    'no_owner': '',
+}
+
+
+def render(event):
+    """Compact console line for one event, None for events not shown"""
+    kind = event['event']
+    indent = '  ' * event.get('depth', 0)
+    if kind == 'decision':
+        lang = event.get('lang')
+        if event.get('owner'):
+            status = event['status']
+            label = f"@{event['owner']} -> {STATUS_LABELS.get(status, f'[{status.upper()}]')}"
+        else:
+            label = 'NOT_FOUND'
+        return f"{indent}[L{event.get('depth', 0)}] {event['channel']}: {lang} | {label}"
+    if kind == 'expand':
+        if event.get('error'):
+            return f"{indent}  -> similar: error ({event['error']})"
+        if event.get('budget_skipped'):
+            return f"{indent}  -> similar: skipped (budget)"
+        line = f"{indent}  -> similar: {event['found']} found, {event['queued']} queued"
+        if event.get('pruned'):
+            line += f", {event['pruned']} pruned"
+        return line
+    if kind == 'crawl_start':
+        if event.get('resumed'):
+            return (f"[*] Resuming crawl {event['crawl_id']}: {event['queued']} queued, "
+                    f"{event['processed']} already processed")
+        prefix = "[*] Nothing to resume. " if event.get('resume_requested') else "[*] "
+        return f"{prefix}Crawl {event['crawl_id']} started from {event['queued']} seed channels"
+    if kind == 'dialogs':
+        if event.get('error'):
+            return f"[!] Dialog snapshot failed ({event['error']}), checking history per owner"
+        return (f"[*] Dialog snapshot: {event['chats']} private chats of {event['dialogs']} dialogs "
+                f"in {event['seconds']}s")
+    if kind == 'stop':
+        return f"\n[!] Stopping ({event['reason']}): {event.get('detail', '')}. Continue later with --resume"
+    if kind == 'crawl_end':
+        return f"[*] Crawl finished: {event['channels']} channels"
+    return None
+
+
+class EventLog:
+    def __init__(self, path=None, console=True, batch_size=500, flush_delay=FLUSH_DELAY_SECONDS,
+                 max_bytes=0, backups=3):
+        self.path = path
+        self.console = console
+        # 0 = never rotate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self.buffer = deque()
+        self.counts = {}
+        self._wakeup = None
+        self._lock = None
+        self._task = None
+        self._closed = False
+
+    def start(self):
+        """Start background consumer (call from inside the event loop)"""
+        if self._task is not None:
+            return
+        self._closed = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._consumer())
+
+    def emit(self, event, **fields):
+        """Record one event; never blocks"""
+        fields['ts'] = round(time.time(), 3)
+        fields['event'] = event
+        self.buffer.append(fields)
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _consumer(self):
+        while not self._closed:
+            await self._wakeup.wait()
+            if len(self.buffer) < self.batch_size and not self._closed:
+                try:
+                    await asyncio.wait_for(self._closing.wait(), timeout=self.flush_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Render and write everything buffered so far"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # One flush at a time keeps the file in emit order
+        async with self._lock:
+            while self.buffer:
+                batch = [self.buffer.popleft() for _ in range(min(len(self.buffer), self.batch_size))]
+                if self.console:
+                    lines = [line for line in map(render, batch) if line is not None]
+                    if lines:
+                        print('\n'.join(lines), flush=True)
+                if self.path:
+                    await asyncio.get_running_loop().run_in_executor(None, self.write_batch, batch)
+
+    def write_batch(self, batch):
+        data = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in batch)
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self.rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+    def rotate(self):
+        """events.jsonl -> events.jsonl.1 -> ... -> .N; the oldest file is dropped"""
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    async def close(self):
+        """Stop the consumer and write what is left"""
+        self._closed = True
+        if self._task is not None:
+            self._closing.set()
+            self._wakeup.set()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def iter_events(path, event=None):
+    """Read an events file back, optionally only one event type"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if event is None or record['event'] == event:
+                    yield record
+
+
+def last_run(path):
+    """Decisions per status and how the last run in an events file ended"""
+    statuses, ending = {}, None
+    for record in iter_events(path):
+        kind = record['event']
+        if kind == 'crawl_start':
+            statuses, ending = {}, None
+        elif kind == 'decision':
+            statuses[record['status']] = statuses.get(record['status'], 0) + 1
+        elif kind == 'stop':
+            ending = f"stopped: {record['reason']}, {record.get('detail', '')}"
+        elif kind == 'crawl_end':
+            ending = 'crawl finished'
+    return statuses, ending
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Results export
+Streams result rows from the state store into xlsx (openpyxl write-only),
+CSV, JSONL or Parquet. Rows are read in chunks and written as they
+arrive, so memory stays flat however large the store gets. Status,
+language and date filters run in SQL; an incremental export appends
+the rows added since the last export to the same CSV / JSONL file, or
+writes them to a new timestamped xlsx / Parquet file next to it.
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+EXPORT_FIELDS = ('channel', 'link', 'owner', 'lang', 'status', 'date')
+XLSX_HEADER = ('Channel Link', 'Owner Username', 'Language', 'Status', 'Date')
+PARQUET_BATCH_SIZE = 10000
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Formats an incremental export appends to; the others get one file per delta
+APPEND_FORMATS = ('csv', 'jsonl')
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_row(r):
+    """Result dict -> export record (adds the channel link)"""
+    return {
+        'channel': r['channel'],
+        'link': f"https://t.me/{r['channel']}",
+        'owner': r['owner'],
+        'lang': r['lang'],
+        'status': r['status'],
+        'date': r['date'],
+    }
+
+
+def _replace(tmp_path, path):
+    # Write next to the target and swap, so a crash never leaves a broken file
+    os.replace(tmp_path, path)
+
+
+# ==================== WRITERS ====================
+
+def write_xlsx(rows, path):
+    """contacts.xlsx layout, in one pass using openpyxl write-only mode"""
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill, Font
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for column, width in zip('ABCDE', (40, 25, 10, 14, 20)):
+        ws.column_dimensions[column].width = width
+
+    header = []
+    for h in XLSX_HEADER:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+        cell.font = Font(bold=True, color='FFFFFF')
+        header.append(cell)
+    ws.append(header)
+
+    count = 0
+    for r in rows:
+        ws.append([f"https://t.me/{r['channel']}", f"@{r['owner']}", r['lang'], r['status'], r['date']])
+        count += 1
+
+    tmp_path = path + '.tmp'
+    wb.save(tmp_path)
+    _replace(tmp_path, path)
+    return count
+
+
+def write_csv(rows, path, append=False):
+    """append: add rows to an existing file (the header only goes into a new one)"""
+    new = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+    tmp_path = path + '.tmp' if not append else path
+    count = 0
+    with open(tmp_path, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        if new:
+            writer.writeheader()
+        for r in rows:
+            writer.writerow(export_row(r))
+            count += 1
+    if not append:
+        _replace(tmp_path, path)
+    return count
+
+
+def write_jsonl(rows, path, append=False):
+    tmp_path = path + '.tmp' if not append else path
+    count = 0
+    with open(tmp_path, 'a' if append else 'w', encoding='utf-8') as f:
+        for r in rows:
+            f.write(json.dumps(export_row(r), ensure_ascii=False) + '\n')
+            count += 1
+    if not append:
+        _replace(tmp_path, path)
+    return count
+
+
+def write_parquet(rows, path):
+    """Parquet row groups of PARQUET_BATCH_SIZE rows (needs pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(name, pa.string()) for name in EXPORT_FIELDS])
+    tmp_path = path + '.tmp'
+    count = 0
+    batch = {name: [] for name in EXPORT_FIELDS}
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for r in rows:
+            for name, value in export_row(r).items():
+                batch[name].append(value)
+            count += 1
+            if count % PARQUET_BATCH_SIZE == 0:
+                writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+                batch = {name: [] for name in EXPORT_FIELDS}
+        if batch['channel'] or not count:
+            writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+    _replace(tmp_path, path)
+    return count
+
+
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+    'parquet': write_parquet,
+}
+
+
+# ==================== EXPORT ====================
+
+def format_for(path, fmt=None):
+    """Export format: given explicitly, or taken from the file extension"""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.')).lower()
+    if fmt == 'json':
+        fmt = 'jsonl'
+    if fmt not in WRITERS:
+        raise ExportError(f"Unknown export format '{fmt}' (use {', '.join(WRITERS)})")
+    return fmt
+
+
+def date_bound(value, end=False):
+    """'YYYY-MM-DD[ HH:MM[:SS]]' -> the results.date format; a bare end date covers the whole day"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Bad date '{value}' (use YYYY-MM-DD or 'YYYY-MM-DD HH:MM')")
+    if end and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed.strftime(DATE_FORMAT)
+
+
+def cursor_key(path):
+    # realpath: a symlink or another spelling of the same file shares one cursor
+    return f"export_cursor:{os.path.normcase(os.path.realpath(path))}"
+
+
+def delta_path(path):
+    """contacts.xlsx -> contacts-YYYYmmdd-HHMMSS.xlsx (a new name, never an existing file)"""
+    stem, ext = os.path.splitext(path)
+    base = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}"
+    candidate, n = base + ext, 1
+    while os.path.exists(candidate):
+        n += 1
+        candidate = f"{base}-{n}{ext}"
+    return candidate
+
+
+def export_results(store, path, fmt=None, statuses=None, langs=None, since=None, until=None,
+                   incremental=False):
+    """Write matching results; returns (rows written, file written).
+
+    incremental: only rows added since the last incremental export to this path,
+    appended to it (CSV, JSONL) or written to a new timestamped file (xlsx, Parquet).
+    """
+    fmt = format_for(path, fmt)
+    writer = WRITERS[fmt]
+    after_id = int(store.get_meta(cursor_key(path), 0) or 0) if incremental else 0
+    # Rows the crawl adds while we write belong to the next export
+    upto_id = store.max_result_id()
+    rows = store.iter_results(
+        after_id=after_id,
+        upto_id=upto_id,
+        statuses=statuses,
+        langs=langs,
+        since=date_bound(since),
+        until=date_bound(until, end=True),
+    )
+    target = path
+    if not incremental:
+        count = writer(rows, target)
+    elif fmt in APPEND_FORMATS:
+        count = writer(rows, target, append=True)
+    else:
+        target = delta_path(path)
+        count = writer(rows, target)
+    if incremental:
+        store.set_meta(cursor_key(path), str(upto_id))
+    return count, target
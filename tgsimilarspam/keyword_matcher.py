@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyword relevance scoring
+Aho-Corasick automaton over all configured keywords: one pass over a
+title or description finds every keyword at once, however many there
+are. Channel relevance is the number of distinct keywords found, the
+title counting more than the description, and cached post texts (when
+there are any) less.
+"""
+
+from collections import deque
+
+TITLE_WEIGHT = 2
+ABOUT_WEIGHT = 1
+# Keywords only found in cached posts
+POSTS_WEIGHT = 0.5
+# Share of the parent's relevance a recommended channel inherits
+PARENT_WEIGHT = 0.5
+
+
+class KeywordMatcher:
+    def __init__(self, keywords=()):
+        self.keywords = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+        # Trie as parallel lists: goto[state] = {char: state}, out[state] = keyword ids
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [frozenset()]
+        for i, word in enumerate(self.keywords):
+            self._add(word, i)
+        self._link()
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def _add(self, word, index):
+        state = 0
+        for char in word:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(frozenset())
+            state = nxt
+        self.out[state] = self.out[state] | {index}
+
+    def _link(self):
+        """Breadth-first failure links; outputs are merged along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and char not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(char, 0)
+                self.out[nxt] = self.out[nxt] | self.out[self.fail[nxt]]
+
+    def matches(self, text):
+        """Set of keyword ids found in text (case-insensitive)"""
+        found = set()
+        if not text or not self.keywords:
+            return found
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def score(self, title=None, about=None, posts=()):
+        """Relevance of one channel from its title, description and cached post texts"""
+        if not self.keywords:
+            return 0
+        in_title = self.matches(title)
+        in_about = self.matches(about)
+        score = TITLE_WEIGHT * len(in_title) + ABOUT_WEIGHT * len(in_about)
+        if posts:
+            score += POSTS_WEIGHT * len(self.matches('\n'.join(posts)) - in_title - in_about)
+        return score
+
+    def priority(self, title, parent_score):
+        """Frontier priority of a recommended channel before its description is known"""
+        return TITLE_WEIGHT * len(self.matches(title)) + PARENT_WEIGHT * parent_score
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script-based language detector
+Counts letters per script without a per-character Python loop: ASCII
+letters and Cyrillic are counted on the UTF-8 bytes (bytes.translate /
+bytes.count), everything else with precompiled regexes over the few
+remaining characters. Script shares are mapped to language codes with
+configurable rules. The default rules are the old RU/EN rule: 30%+
+Cyrillic letters is RU, under 10% is EN, anything between is unknown.
+"""
+
+import re
+
+# Unicode blocks per script
+SCRIPT_RANGES = {
+    'cyrillic': 'Ѐ-ӿ',
+    'latin': 'A-Za-zÀ-ɏḀ-ỿ',
+    'greek': 'Ͱ-Ͽ',
+    'armenian': '԰-֏',
+    'hebrew': '֐-׿',
+    'arabic': '؀-ۿݐ-ݿࢠ-ࣿ',
+    'devanagari': 'ऀ-ॿ',
+    'thai': '฀-๿',
+    'georgian': 'Ⴀ-ჿ',
+    'hangul': 'ᄀ-ᇿ가-힯',
+    'kana': '぀-ヿ',
+    'han': '㐀-䶿一-鿿',
+}
+
+# Rules are checked in order; share = script letters / all letters
+DEFAULT_RULES = [
+    {'lang': 'RU', 'script': 'cyrillic', 'min_share': 0.30},
+    {'lang': 'EN', 'script': 'cyrillic', 'max_share': 0.10},
+]
+
+# Example of a wider rule set (config: "language_rules")
+MULTI_SCRIPT_RULES = [
+    {'lang': 'RU', 'script': 'cyrillic', 'min_share': 0.30},
+    {'lang': 'AR', 'script': 'arabic', 'min_share': 0.30},
+    {'lang': 'HE', 'script': 'hebrew', 'min_share': 0.30},
+    # Kana before Han: Japanese text is often mostly kanji
+    {'lang': 'JA', 'script': 'kana', 'min_share': 0.10},
+    {'lang': 'ZH', 'script': 'han', 'min_share': 0.30},
+    {'lang': 'KO', 'script': 'hangul', 'min_share': 0.30},
+    {'lang': 'HI', 'script': 'devanagari', 'min_share': 0.30},
+    {'lang': 'TH', 'script': 'thai', 'min_share': 0.30},
+    {'lang': 'EL', 'script': 'greek', 'min_share': 0.30},
+    {'lang': 'EN', 'script': 'latin', 'min_share': 0.90},
+]
+
+_NON_LETTERS = re.compile(r'[\W\d_]+')
+_SCRIPT_PATTERNS = {name: re.compile(f'[{chars}]+') for name, chars in SCRIPT_RANGES.items()}
+
+# Every byte except A-Z / a-z, for bytes.translate(None, delete)
+_ASCII_NON_LETTERS = bytes(i for i in range(256) if not (65 <= i <= 90 or 97 <= i <= 122))
+# U+0400-U+04FF is exactly the set of characters with UTF-8 lead byte D0-D3
+_CYRILLIC_LEAD_BYTES = (b'\xd0', b'\xd1', b'\xd2', b'\xd3')
+# Characters that are neither ASCII nor Cyrillic
+_OTHER_CHARS = re.compile('[^\x00-\x7fЀ-ӿ]+')
+
+
+def count_scripts(text, scripts=None):
+    """Return (letters_total, {script: letters}) for one text"""
+    if not text:
+        return 0, {}
+
+    data = text.encode('utf-8', 'surrogatepass')
+    ascii_letters = len(data.translate(None, _ASCII_NON_LETTERS))
+    cyrillic = sum(data.count(lead) for lead in _CYRILLIC_LEAD_BYTES)
+
+    # Usually only a handful of emoji, dashes or accented letters
+    rest = ''.join(_OTHER_CHARS.findall(text))
+    if rest:
+        rest = _NON_LETTERS.sub('', rest)
+
+    counts = {}
+    for name in scripts or SCRIPT_RANGES:
+        if name == 'cyrillic':
+            counts[name] = cyrillic
+            continue
+        n = len(rest) - len(_SCRIPT_PATTERNS[name].sub('', rest)) if rest else 0
+        counts[name] = n + ascii_letters if name == 'latin' else n
+
+    return ascii_letters + cyrillic + len(rest), counts
+
+
+class ScriptDetector:
+    def __init__(self, rules=None, min_letters=1):
+        self.rules = list(rules or DEFAULT_RULES)
+        self.min_letters = min_letters
+        unknown = {r['script'] for r in self.rules} - set(SCRIPT_RANGES)
+        if unknown:
+            raise ValueError(f"Unknown script in language rules: {', '.join(sorted(unknown))}")
+        # Only count the scripts the rules look at
+        self.scripts = sorted({r['script'] for r in self.rules})
+
+    def classify(self, total, counts):
+        """Apply rules to letter counts, None if undecided"""
+        if total < self.min_letters:
+            return None
+        for rule in self.rules:
+            share = counts.get(rule['script'], 0) / total
+            if share >= rule.get('min_share', 0.0) and share < rule.get('max_share', 1.01):
+                return rule['lang']
+        return None
+
+    def detect(self, texts):
+        """Detect language of one text or of several texts taken together"""
+        if texts is None:
+            return None
+        if not isinstance(texts, str):
+            texts = '\n'.join(t for t in texts if t)
+        total, counts = count_scripts(texts, self.scripts)
+        return self.classify(total, counts)
+
+    def detect_many(self, batches):
+        """Detect one verdict per item; each item is a text or a list of texts"""
+        return [self.detect(texts) for texts in batches]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run metrics
+Counters, gauges and fixed-bucket histograms kept in plain dicts. Every
+Telegram call is timed by the rate limiter (per request type and
+outcome, plus time spent waiting for a token). A background task writes
+the Prometheus text format to a file every few seconds (for the
+node_exporter textfile collector, or just `cat`), and a JSON summary is
+written when the bot stops.
+"""
+
+import asyncio
+import bisect
+import json
+import os
+import time
+
+PREFIX = 'tgbot_'
+METRICS_INTERVAL_SECONDS = 15
+
+# Seconds; Telegram calls are ~50ms-2s, limiter waits and flood pauses go far beyond
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+HELP = {
+    'api_calls_total': ('counter', 'Telegram API calls by request type and outcome'),
+    'api_latency_seconds': ('histogram', 'Duration of one Telegram API call'),
+    'api_wait_seconds': ('histogram', 'Time spent waiting for the rate limiter'),
+    'flood_wait_seconds_total': ('counter', 'Seconds of FloodWait asked by Telegram'),
+    'cache_hits_total': ('counter', 'Cache hits by cache'),
+    'cache_misses_total': ('counter', 'Cache misses by cache'),
+    'queue_depth': ('gauge', 'Items waiting in a queue'),
+    'results_total': ('counter', 'Processed channels by result status'),
+    'uptime_seconds': ('gauge', 'Seconds since the run started'),
+}
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bucket bound holding the q-quantile (None if empty, '+Inf' past the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return '+Inf'
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+class Metrics:
+    def __init__(self, path=None, summary_path=None, interval=METRICS_INTERVAL_SECONDS):
+        self.path = path
+        self.summary_path = summary_path
+        self.interval = interval
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        # Called before every write to refresh gauges / cache counters
+        self.collectors = []
+        self._task = None
+        self._closed = False
+
+    # ==================== RECORDING ====================
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        self.gauges[(name, _labels(labels))] = value
+
+    def set_total(self, name, value, **labels):
+        """Counter whose running total is kept elsewhere (cache stats)"""
+        self.counters[(name, _labels(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram()
+        hist.observe(value)
+
+    def api_call(self, kind, outcome, seconds):
+        """One finished Telegram call"""
+        self.inc('api_calls_total', kind=kind, outcome=outcome)
+        self.observe('api_latency_seconds', seconds, kind=kind)
+
+    def collect(self):
+        self.set('uptime_seconds', round(time.time() - self.started, 3))
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception:
+                pass
+
+    # ==================== EXPORT ====================
+
+    def render(self):
+        """Prometheus text exposition format"""
+        self.collect()
+        by_name = {}
+        for store in (self.counters, self.gauges, self.histograms):
+            for (name, labels), value in store.items():
+                by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text = HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {PREFIX}{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}{name} {kind}')
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if isinstance(value, Histogram):
+                    cumulative = 0
+                    for bound, n in zip(value.buckets + (float('inf'),), value.counts):
+                        cumulative += n
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{PREFIX}{name}_bucket{_fmt_labels(labels, [("le", le)])} {cumulative}')
+                    lines.append(f'{PREFIX}{name}_sum{_fmt_labels(labels)} {value.sum:.6f}')
+                    lines.append(f'{PREFIX}{name}_count{_fmt_labels(labels)} {value.count}')
+                else:
+                    lines.append(f'{PREFIX}{name}{_fmt_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Plain dict for the JSON summary"""
+        self.collect()
+        out = {'counters': {}, 'gauges': {}, 'latency': {}}
+        for (name, labels), value in sorted(self.counters.items()):
+            out['counters'].setdefault(name, {})[_fmt_labels(labels) or 'total'] = value
+        for (name, labels), value in sorted(self.gauges.items()):
+            out['gauges'].setdefault(name, {})[_fmt_labels(labels) or 'value'] = value
+        for (name, labels), hist in sorted(self.histograms.items()):
+            out['latency'].setdefault(name, {})[_fmt_labels(labels) or 'all'] = {
+                'count': hist.count,
+                'total_seconds': round(hist.sum, 3),
+                'mean_seconds': round(hist.sum / hist.count, 4) if hist.count else None,
+                'p50_le': hist.quantile(0.5),
+                'p95_le': hist.quantile(0.95),
+            }
+        return out
+
+    def write_textfile(self):
+        """Atomic write, so a scraper never reads half a file"""
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp, self.path)
+
+    def write_summary(self):
+        if not self.summary_path:
+            return
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2, default=str)
+
+    # ==================== WRITER ====================
+
+    def start(self):
+        """Start periodic textfile writer (call from inside the event loop)"""
+        if self._task is None and self.path:
+            self._task = asyncio.create_task(self._writer())
+
+    async def _writer(self):
+        while not self._closed:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write_textfile()
+            except OSError:
+                pass
+
+    async def close(self):
+        """Stop the writer, write the final textfile and the JSON summary"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            self.write_textfile()
+            self.write_summary()
+        except OSError as e:
+            print(f"[ERROR] Metrics export failed: {e}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Owner extraction from channel descriptions
+Precompiled patterns find @handles, t.me / telegram.me links and
+tg://resolve links, scores each candidate by its context (a "contact:",
+"admin:", "реклама:" line beats a bare mention) and drops the channel's
+own handle plus bot and service accounts. Output is a stable, ranked list.
+"""
+
+import re
+
+# Telegram usernames: letter first, then letters/digits/underscore, 4-32 chars total
+_HANDLE = r'[A-Za-z][A-Za-z0-9_]{3,31}'
+
+# Each pattern starts with a literal, so the regex engine can skip ahead cheaply
+_AT = re.compile(r'@(' + _HANDLE + r')\b')
+# Anchored on the left, so about.me/name or chat.me/name is not read as a t.me link
+_LINK = re.compile(r'(?<![\w.-])(?:https?://)?(?:www\.)?(?:t|telegram)\.me/(?:s/)?(' + _HANDLE + r')\b(?![/+])',
+                   re.IGNORECASE)
+_TG = re.compile(r'tg://resolve\?domain=(' + _HANDLE + r')\b', re.IGNORECASE)
+
+# Context markers, matched on the lowercased line of a candidate
+CONTEXT_WORDS = (
+    'contact', 'admin', 'owner', 'manager', 'founder', 'author', 'advert', 'promo',
+    'cooperat', 'collab', 'partner', 'business', 'inquir', 'feedback', 'write me',
+    'связь', 'контакт', 'админ', 'владел', 'менеджер', 'автор', 'основател',
+    'реклам', 'сотруднич', 'по вопросам', 'пишите', 'писать', 'обратн', 'предложен',
+)
+_CONTEXT_SHORT = re.compile(r'\b(?:ads?|dm|pm|ceo)\b')
+
+# t.me paths that are not usernames
+SERVICE_PATHS = frozenset({
+    'joinchat', 'addstickers', 'addemoji', 'addlist', 'addtheme', 'setlanguage',
+    'share', 'proxy', 'socks', 'login', 'confirmphone', 'iv', 'bg', 'invoice',
+    'boost', 'contact', 'giftcode', 'c',
+})
+
+# Accounts that are never a channel owner
+SERVICE_HANDLES = frozenset({
+    'telegram', 'durov', 'botfather', 'spambot', 'stickers', 'gif', 'vid', 'pic',
+    'bing', 'wiki', 'imdb', 'bold', 'youtube', 'like', 'vote', 'tgstat', 'telemetr',
+    'username', 'premium', 'jobs', 'notoscam', 'previews', 'wallet', 'tonkeeper',
+})
+
+SCORE_MENTION = 3
+SCORE_LINK = 1
+SCORE_CONTEXT = 5
+SCORE_REPEAT = 1
+
+
+def is_service_handle(handle):
+    """Bots and well-known service accounts"""
+    return handle.endswith('bot') or handle in SERVICE_HANDLES or handle in SERVICE_PATHS
+
+
+class OwnerExtractor:
+    def __init__(self, extra_excluded=()):
+        self.excluded = frozenset(h.lstrip('@').lower() for h in extra_excluded)
+
+    def candidates(self, about, channel=None):
+        """Return [(handle, score)] sorted by score, then first appearance"""
+        if not about:
+            return []
+
+        found = []
+        if '@' in about:
+            for m in _AT.finditer(about):
+                # Skip e-mail addresses and "@@x"
+                prev = about[m.start() - 1] if m.start() else ' '
+                if not (prev.isalnum() or prev in '_@/.'):
+                    found.append((m.start(), m.end(), m.group(1), SCORE_MENTION))
+        if 'me/' in about or 'ME/' in about:
+            for m in _LINK.finditer(about):
+                found.append((m.start(), m.end(), m.group(1), SCORE_LINK))
+        if 'tg:' in about:
+            for m in _TG.finditer(about):
+                found.append((m.start(), m.end(), m.group(1), SCORE_LINK))
+        if not found:
+            return []
+        found.sort()
+
+        own = channel.lstrip('@').lower() if channel else None
+        scores = {}
+        first_pos = {}
+        line_context = {}
+
+        for start, end, handle, score in found:
+            handle = handle.lower()
+            if handle == own or handle in self.excluded or is_service_handle(handle):
+                continue
+
+            # Context is judged per line, looked up once per line
+            line_start = about.rfind('\n', 0, start) + 1
+            context = line_context.get(line_start)
+            if context is None:
+                line_end = about.find('\n', end)
+                line = about[line_start:line_end if line_end >= 0 else len(about)].lower()
+                context = any(w in line for w in CONTEXT_WORDS) or _CONTEXT_SHORT.search(line) is not None
+                line_context[line_start] = context
+            if context:
+                score += SCORE_CONTEXT
+
+            if handle in scores:
+                scores[handle] = max(scores[handle], score) + SCORE_REPEAT
+            else:
+                scores[handle] = score
+                first_pos[handle] = start
+
+        return sorted(scores.items(), key=lambda item: (-item[1], first_pos[item[0]]))
+
+    def extract(self, about, channel=None):
+        """Ranked owner handles (best first), deterministic across runs"""
+        return [handle for handle, _ in self.candidates(about, channel)]
+
+    def extract_many(self, items):
+        """Batch form: items are (about, channel) pairs"""
+        return [self.extract(about, channel) for about, channel in items]
+
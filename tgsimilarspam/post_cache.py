@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental post cache
+The newest posts of each channel (id, date, text hash, first characters
+of the text) are kept in the state store. While they are fresher than
+the TTL they are reused without any call; after that only messages newer
+than the newest cached id are asked for (min_id), so a channel that has
+not posted costs one empty answer instead of a full download. Cached
+texts feed language detection and keyword scoring.
+"""
+
+import hashlib
+import time
+
+POST_CACHE_SIZE = 5
+POST_CACHE_TTL_SECONDS = 24 * 3600
+POST_TEXT_CHARS = 280
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class PostCache:
+    def __init__(self, store, ttl=POST_CACHE_TTL_SECONDS, size=POST_CACHE_SIZE, text_chars=POST_TEXT_CHARS):
+        self.store = store
+        self.ttl = ttl
+        self.size = size
+        self.text_chars = text_chars
+        self.hits = 0
+        self.refreshed = 0
+        self.unchanged = 0
+        self.fetched = 0
+
+    def cached(self, channel):
+        """Cached texts, newest first, whatever their age (no network call)"""
+        cached = self.store.get_posts(channel)
+        return [text for _, _, _, text in cached[2]] if cached is not None else []
+
+    async def texts(self, fetch, channel, entity):
+        """Texts of the newest posts; fetch(entity, limit, min_id) is only called when stale"""
+        cached = self.store.get_posts(channel)
+        if cached is not None and time.time() - cached[1] <= self.ttl:
+            self.hits += 1
+            return [text for _, _, _, text in cached[2]]
+
+        max_id, rows = (cached[0], cached[2]) if cached is not None else (0, [])
+        messages = await fetch(entity, self.size, max_id)
+        if cached is None:
+            self.fetched += 1
+        elif messages:
+            self.refreshed += 1
+        else:
+            self.unchanged += 1
+
+        seen = {row[2] for row in rows}
+        new = []
+        for msg in messages:
+            max_id = max(max_id, msg.id)
+            text = msg.text
+            if not text:
+                continue
+            digest = text_hash(text)
+            # Reposts of the same text add nothing to a language or keyword sample
+            if digest in seen:
+                continue
+            seen.add(digest)
+            date = msg.date.timestamp() if msg.date is not None else None
+            new.append((msg.id, date, digest, text[:self.text_chars]))
+        rows = sorted(new + list(rows), key=lambda row: -row[0])[:self.size]
+        self.store.put_posts(channel, rows, max_id)
+        return [text for _, _, _, text in rows]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive API rate limiter
+One token bucket per request type plus a global bucket, shared by every
+Telegram API call. FloodWaitError pauses that request type for the full
+time Telegram asks for and the call is retried; the bucket rate backs
+off on every flood and creeps up again after a run of clean calls, so
+the limiter learns a safe steady-state rate over the run. With a
+Metrics object every call is timed per request type and outcome; with
+an enabled Tracer the token wait and the call itself become spans.
+"""
+
+import asyncio
+import time
+
+from telethon.errors import FloodWaitError
+
+from .tracing import Tracer
+
+API_RATE_PER_SECOND = 2.0
+API_BURST = 5
+FLOOD_MAX_WAIT_SECONDS = 900
+FLOOD_MAX_RETRIES = 3
+
+# Rate learning (AIMD): halve on flood, +10% after a clean streak
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+RECOVERY_STREAK = 20
+MIN_RATE = 0.05
+
+
+class RateLimitExceeded(Exception):
+    """FloodWait longer than we are willing to sleep in this run"""
+
+    def __init__(self, kind, seconds):
+        super().__init__(f"flood wait of {seconds}s on {kind}")
+        self.kind = kind
+        self.seconds = seconds
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.clean_streak = 0
+
+    async def acquire(self):
+        """Wait out any flood pause, then take one token"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.clean_streak = 0
+        self.rate = max(MIN_RATE, self.rate * BACKOFF_FACTOR)
+
+    def success(self):
+        self.clean_streak += 1
+        if self.clean_streak >= RECOVERY_STREAK and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            self.clean_streak = 0
+
+
+class RateLimiter:
+    def __init__(self, rate=API_RATE_PER_SECOND, burst=API_BURST, rates=None,
+                 max_wait=FLOOD_MAX_WAIT_SECONDS, max_retries=FLOOD_MAX_RETRIES, metrics=None,
+                 tracer=None):
+        self.rate = rate
+        self.burst = burst
+        # Per request type starting rates, e.g. {'send_message': 0.1}
+        self.rates = dict(rates or {})
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(rate, burst)
+        self.buckets = {}
+        self.calls = {}
+        self.flood_waits = {}
+        self.flood_seconds = 0
+        self.metrics = metrics
+        self.tracer = tracer or Tracer()
+
+    def bucket(self, kind):
+        if kind not in self.buckets:
+            self.buckets[kind] = TokenBucket(self.rates.get(kind, self.rate), self.burst)
+        return self.buckets[kind]
+
+    async def acquire(self, kind='default'):
+        """Wait for a token of this request type and of the global bucket"""
+        bucket = self.bucket(kind)
+        remaining = bucket.paused_until - time.monotonic()
+        if remaining > self.max_wait:
+            raise RateLimitExceeded(kind, int(remaining))
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+
+    async def call(self, kind, func, *args, **kwargs):
+        """Run one API call under the limiter, retrying after FloodWait"""
+        bucket = self.bucket(kind)
+        metrics = self.metrics
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            with self.tracer.span(f'wait:{kind}'):
+                await self.acquire(kind)
+            started = time.perf_counter()
+            if metrics is not None:
+                metrics.observe('api_wait_seconds', started - waited, kind=kind)
+            try:
+                with self.tracer.span(f'api:{kind}'):
+                    result = await func(*args, **kwargs)
+            except FloodWaitError as e:
+                if metrics is not None:
+                    metrics.api_call(kind, 'flood_wait', time.perf_counter() - started)
+                    metrics.inc('flood_wait_seconds_total', e.seconds, kind=kind)
+                self.flood_waits[kind] = self.flood_waits.get(kind, 0) + 1
+                self.flood_seconds += e.seconds
+                bucket.pause(e.seconds + 1)
+                attempt += 1
+                if e.seconds > self.max_wait or attempt > self.max_retries:
+                    raise RateLimitExceeded(kind, e.seconds) from e
+                continue
+            except Exception as e:
+                # Callers swallow most errors; the outcome label keeps them visible
+                if metrics is not None:
+                    metrics.api_call(kind, type(e).__name__, time.perf_counter() - started)
+                raise
+            if metrics is not None:
+                metrics.api_call(kind, 'ok', time.perf_counter() - started)
+            bucket.success()
+            return result
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def learned_rates(self):
+        """Current per-type rates (calls/sec) after backoff and recovery"""
+        return {kind: round(b.rate, 3) for kind, b in self.buckets.items()}
+
+    def load_rates(self, rates):
+        """Start from rates learned in an earlier run"""
+        for kind, rate in (rates or {}).items():
+            self.bucket(kind).rate = max(MIN_RATE, min(rate, self.bucket(kind).max_rate))
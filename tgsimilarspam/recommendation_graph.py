@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent recommendation graph
+Every GetChannelRecommendationsRequest answer is stored as edges
+(src -> dst, with dst id + access hash) in the state store. While a
+channel's edges are fresher than the TTL, the crawl reads neighbours
+from disk instead of asking Telegram again.
+"""
+
+import time
+
+from telethon.tl.types import InputPeerChannel
+
+GRAPH_TTL_SECONDS = 7 * 86400
+
+
+class RecommendationGraph:
+    def __init__(self, store, ttl=GRAPH_TTL_SECONDS):
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def neighbours(self, channel):
+        """Cached [(username, input_peer_or_None, title)] in API order, None if missing or stale"""
+        cached = self.store.get_edges(channel)
+        if cached is None or time.time() - cached[0] > self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [
+            (dst, InputPeerChannel(dst_id, access_hash) if dst_id and access_hash is not None else None, title)
+            for dst, dst_id, access_hash, title in cached[1]
+        ]
+
+    def record(self, channel, chats):
+        """Store every recommended channel (not just the first few) as an edge"""
+        edges = []
+        for ch in chats:
+            username = getattr(ch, 'username', None)
+            if username:
+                edges.append((username, getattr(ch, 'id', None), getattr(ch, 'access_hash', None),
+                              getattr(ch, 'title', None)))
+        self.store.put_edges(channel, edges)
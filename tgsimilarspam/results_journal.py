@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Buffered results journal
+Buffers processed-channel results and hands them in batches to a sink
+(the state store, or a JSONL file) from a background task, so the crawl
+never waits on disk. Results are small slotted records that live only
+until their batch is written; the bot keeps running counts instead.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from .state_store import RESULT_FIELDS
+
+FLUSH_INTERVAL_SECONDS = 5
+FLUSH_BATCH_SIZE = 200
+
+
+# ==================== RECORDS ====================
+
+class ResultRecord:
+    """One processed channel; reads like a result dict (r['owner'], r.get, dict(r))"""
+    __slots__ = ('channel', 'owner', 'lang', 'status', 'at')
+
+    def __init__(self, channel, owner, lang, status, at=None):
+        self.channel = channel
+        self.owner = owner
+        self.lang = lang
+        self.status = status
+        # Epoch float until written: cheaper than a formatted date string
+        self.at = time.time() if at is None else at
+
+    @property
+    def date(self):
+        return datetime.fromtimestamp(self.at).strftime('%Y-%m-%d %H:%M:%S')
+
+    def keys(self):
+        return RESULT_FIELDS
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class ResultTally:
+    """Running counts of results, in place of a list of every row"""
+
+    def __init__(self):
+        self.total = 0
+        self.owners = 0
+        self.by_status = {}
+
+    def add(self, result):
+        self.total += 1
+        if result['status'] != 'no_owner':
+            self.owners += 1
+        self.by_status[result['status']] = self.by_status.get(result['status'], 0) + 1
+
+    def __len__(self):
+        return self.total
+
+    def summary(self):
+        return ', '.join(f"{status} {count}" for status, count in
+                         sorted(self.by_status.items(), key=lambda item: -item[1]))
+
+
+class ResultsJournal:
+    def __init__(self, sink, flush_interval=FLUSH_INTERVAL_SECONDS, batch_size=FLUSH_BATCH_SIZE):
+        # sink(rows) is blocking and runs in a worker thread
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer = []
+        self._lock = None
+        self._wakeup = None
+        self._task = None
+        self._closed = False
+
+    def start(self):
+        """Start background writer (call from inside the event loop)"""
+        if self._task is not None:
+            return
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._writer())
+
+    def append(self, result):
+        """Queue one result row, wake the writer when a batch is full"""
+        self.buffer.append(result)
+        if len(self.buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _writer(self):
+        """Flush on timer or when a full batch is waiting"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered rows in a worker thread"""
+        if not self.buffer:
+            return
+        async with self._lock:
+            batch, self.buffer = self.buffer, []
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.write_batch, batch)
+
+    def write_batch(self, batch):
+        """Hand rows to the sink (blocking)"""
+        if batch:
+            self.sink(batch)
+
+    async def close(self):
+        """Stop writer and flush everything still buffered"""
+        self._closed = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.flush()
+        else:
+            batch, self.buffer = self.buffer, []
+            self.write_batch(batch)
+
+
+# ==================== FILES ====================
+
+def append_jsonl(path, rows):
+    """Append rows to a JSONL journal file"""
+    data = ''.join(json.dumps(dict(r), ensure_ascii=False) + '\n' for r in rows)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def iter_journal(path):
+    """Yield result rows from a JSONL journal, skipping broken lines"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Half-written last line after a crash
+                continue
+
+
+def iter_legacy_xlsx(xlsx_path):
+    """Yield result rows from an old two-column contacts.xlsx"""
+    if not os.path.exists(xlsx_path):
+        return
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+    try:
+        for link, owner in wb.active.iter_rows(min_row=2, max_col=2, values_only=True):
+            if not link:
+                continue
+            yield {
+                'channel': str(link).rsplit('/', 1)[-1],
+                'owner': str(owner or '').lstrip('@') or 'NOT_FOUND',
+                'lang': None,
+                'status': None,
+                'date': None,
+            }
+    finally:
+        wb.close()
+
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite state store
+One embedded database (WAL mode) for sent log, processed channels and
+results. Every event is a single indexed insert/upsert instead of a
+full-file rewrite.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sent_log (
+    owner TEXT PRIMARY KEY,
+    sent_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suppressed (
+    owner TEXT PRIMARY KEY,
+    reason TEXT,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suppression_list (
+    owner TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS processed_channels (
+    channel TEXT PRIMARY KEY,
+    depth INTEGER,
+    processed_at TEXT NOT NULL,
+    crawl_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS visited (
+    channel TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS frontier (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    crawl_id INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    expand_score REAL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    peer_id INTEGER NOT NULL,
+    access_hash INTEGER NOT NULL,
+    resolved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    channel TEXT PRIMARY KEY,
+    title TEXT,
+    about TEXT,
+    participants INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS graph_edges (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    dst_id INTEGER,
+    dst_access_hash INTEGER,
+    title TEXT,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (src, dst)
+);
+CREATE TABLE IF NOT EXISTS graph_fetches (
+    src TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    edge_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS language_cache (
+    channel TEXT PRIMARY KEY,
+    lang TEXT NOT NULL,
+    source TEXT,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    channel TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    date REAL,
+    text_hash TEXT,
+    text TEXT,
+    PRIMARY KEY (channel, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS post_checks (
+    channel TEXT PRIMARY KEY,
+    max_id INTEGER NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    owner TEXT,
+    lang TEXT,
+    status TEXT,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_channel ON results(channel);
+CREATE INDEX IF NOT EXISTS idx_results_owner ON results(owner);
+CREATE INDEX IF NOT EXISTS idx_processed_crawl ON processed_channels(crawl_id);
+CREATE INDEX IF NOT EXISTS idx_sent_log_sent_at ON sent_log(sent_at);
+"""
+
+RESULT_FIELDS = ('channel', 'owner', 'lang', 'status', 'date')
+
+
+def iso_to_epoch(value):
+    """Old ISO sent_at (local time) -> epoch seconds, None if unreadable"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class StateStore:
+    def __init__(self, path):
+        self.path = path
+        # Result batches are written from the journal's worker thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._upgrade_schema()
+        self.conn.executescript(SCHEMA)
+        self._migrate_sent_log()
+        self.conn.commit()
+
+    def _upgrade_schema(self):
+        """Add columns introduced after a database was created"""
+        for table, column, decl in [
+            ('processed_channels', 'crawl_id', 'INTEGER'),
+            ('frontier', 'priority', 'REAL NOT NULL DEFAULT 0'),
+            ('frontier', 'expand_score', 'REAL'),
+            ('graph_edges', 'title', 'TEXT'),
+        ]:
+            cols = [r[1] for r in self.conn.execute(f'PRAGMA table_info({table})')]
+            if cols and column not in cols:
+                self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+        # sent_at used to be an ISO string: set aside, converted once SCHEMA made the new table
+        cols = {r[1]: r[2] for r in self.conn.execute('PRAGMA table_info(sent_log)')}
+        if cols.get('sent_at', '').upper() == 'TEXT':
+            self.conn.execute('ALTER TABLE sent_log RENAME TO sent_log_iso')
+
+    def _migrate_sent_log(self):
+        if not self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sent_log_iso'").fetchone():
+            return
+        # Naive ISO strings were local time, like datetime.fromisoformat(...).timestamp().
+        # Rows go in key order and the time index is built afterwards, in one sort
+        self.conn.execute('DROP INDEX IF EXISTS idx_sent_log_sent_at')
+        self.conn.execute(
+            "INSERT OR IGNORE INTO sent_log(owner, sent_at) "
+            "SELECT owner, (julianday(sent_at, 'utc') - 2440587.5) * 86400.0 FROM sent_log_iso "
+            "WHERE julianday(sent_at) IS NOT NULL ORDER BY owner"
+        )
+        self.conn.execute('CREATE INDEX idx_sent_log_sent_at ON sent_log(sent_at)')
+        self.conn.execute('DROP TABLE sent_log_iso')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # ==================== META ====================
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO meta(key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                (key, value)
+            )
+
+    # ==================== SENT LOG ====================
+
+    def load_sent_log(self, since=0):
+        """Return [(owner, sent_at)] messaged after `since` (epoch seconds), oldest first"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT owner, sent_at FROM sent_log WHERE sent_at > ? ORDER BY sent_at', (since,)
+            ).fetchall()
+
+    def mark_sent(self, owner, sent_at):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO sent_log(owner, sent_at) VALUES (?, ?) '
+                'ON CONFLICT(owner) DO UPDATE SET sent_at = excluded.sent_at',
+                (owner, sent_at)
+            )
+
+    def prune_sent(self, before):
+        """Delete owners last messaged before `before` (epoch seconds)"""
+        with self.lock, self.conn:
+            expired = self.conn.execute(
+                'SELECT COUNT(*) FROM sent_log WHERE sent_at <= ?', (before,)
+            ).fetchone()[0]
+            total = self.conn.execute('SELECT COUNT(*) FROM sent_log').fetchone()[0]
+            if expired * 2 < total:
+                self.conn.execute('DELETE FROM sent_log WHERE sent_at <= ?', (before,))
+            else:
+                # Mostly expired (first prune of a long history): keep the few live rows and
+                # empty the table in one step instead of ~1M index deletes
+                self.conn.execute('CREATE TEMP TABLE sent_log_keep AS '
+                                  'SELECT owner, sent_at FROM sent_log WHERE sent_at > ?', (before,))
+                self.conn.execute('DELETE FROM sent_log')
+                self.conn.execute('INSERT INTO sent_log(owner, sent_at) SELECT owner, sent_at FROM sent_log_keep')
+                self.conn.execute('DROP TABLE sent_log_keep')
+        return expired
+
+    # ==================== CHANNELS ====================
+
+    def add_processed(self, channel, depth=None, crawl_id=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO processed_channels(channel, depth, processed_at, crawl_id) '
+                'VALUES (?, ?, ?, ?)',
+                (channel, depth, datetime.now().isoformat(), crawl_id)
+            )
+
+    def iter_processed(self, crawl_id, chunk_size=10000):
+        """Yield channels visited by one crawl, one chunk in memory at a time"""
+        last = ''
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    'SELECT channel FROM processed_channels WHERE crawl_id = ? AND channel > ? '
+                    'ORDER BY channel LIMIT ?',
+                    (crawl_id, last, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            for (channel,) in rows:
+                yield channel
+            last = rows[-1][0]
+
+    # ==================== VISITED ====================
+
+    def clear_visited(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM visited')
+
+    def add_visited(self, channels):
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO visited(channel) VALUES (?)', [(c,) for c in channels])
+
+    def is_visited(self, channel):
+        with self.lock:
+            row = self.conn.execute('SELECT 1 FROM visited WHERE channel = ?', (channel,)).fetchone()
+        return row is not None
+
+    # ==================== FRONTIER ====================
+
+    def new_crawl(self):
+        """Drop any old frontier and start a new crawl id"""
+        crawl_id = int(self.get_meta('crawl_id', 0)) + 1
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM frontier')
+        self.set_meta('crawl_id', str(crawl_id))
+        self.set_meta('crawl_finished', '')
+        return crawl_id
+
+    def frontier_push(self, crawl_id, channel, depth, priority=0.0, expand_score=None):
+        """expand_score: set for a processed channel that still has to be expanded"""
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                'INSERT INTO frontier(crawl_id, channel, depth, priority, expand_score) VALUES (?, ?, ?, ?, ?)',
+                (crawl_id, channel, depth, priority, expand_score)
+            )
+        return cur.lastrowid
+
+    def frontier_remove(self, seq):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM frontier WHERE seq = ?', (seq,))
+
+    def load_frontier(self, crawl_id):
+        """Return [(seq, channel, depth, priority, expand_score)] in insertion order"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT seq, channel, depth, priority, expand_score FROM frontier WHERE crawl_id = ? ORDER BY seq',
+                (crawl_id,)
+            ).fetchall()
+
+    # ==================== ENTITIES ====================
+
+    def get_entity_row(self, key):
+        """Return (kind, peer_id, access_hash, resolved_at) or None"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT kind, peer_id, access_hash, resolved_at FROM entities WHERE key = ?', (key,)
+            ).fetchone()
+
+    def put_entity_row(self, key, kind, peer_id, access_hash, resolved_at):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO entities(key, kind, peer_id, access_hash, resolved_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, kind, peer_id, access_hash, resolved_at)
+            )
+
+    def save_channel(self, channel, title, about, participants):
+        """Keep channel metadata (the about texts double as a benchmark corpus)"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO channels(channel, title, about, participants, updated_at) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(channel) DO UPDATE SET '
+                'title = COALESCE(excluded.title, channels.title), about = excluded.about, '
+                'participants = COALESCE(excluded.participants, channels.participants), '
+                'updated_at = excluded.updated_at',
+                (channel.lower(), title, about, participants, time.time())
+            )
+
+    def iter_abouts(self):
+        """Yield (channel, about) for every saved channel with a description"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT channel, about FROM channels WHERE about IS NOT NULL AND about != ''"
+            ).fetchall()
+        yield from rows
+
+    # ==================== GRAPH ====================
+
+    def get_edges(self, src):
+        """Return (fetched_at, [(dst, dst_id, dst_access_hash, title)]) or None if never fetched"""
+        src = src.lower()
+        with self.lock:
+            fetch = self.conn.execute('SELECT fetched_at FROM graph_fetches WHERE src = ?', (src,)).fetchone()
+            if fetch is None:
+                return None
+            rows = self.conn.execute(
+                'SELECT dst, dst_id, dst_access_hash, title FROM graph_edges WHERE src = ? ORDER BY position',
+                (src,)
+            ).fetchall()
+        return fetch[0], rows
+
+    def put_edges(self, src, edges):
+        """Replace the out-edges of src; edges are (dst, dst_id, dst_access_hash, title)"""
+        src = src.lower()
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM graph_edges WHERE src = ?', (src,))
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO graph_edges(src, dst, position, dst_id, dst_access_hash, title, seen_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(src, dst, i, dst_id, access_hash, title, now)
+                 for i, (dst, dst_id, access_hash, title) in enumerate(edges)]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO graph_fetches(src, fetched_at, edge_count) VALUES (?, ?, ?)',
+                (src, now, len(edges))
+            )
+
+    # ==================== LANGUAGE ====================
+
+    def get_language(self, channel, max_age):
+        """Cached language verdict for a channel, None if missing or older than max_age"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT lang, checked_at FROM language_cache WHERE channel = ?', (channel.lower(),)
+            ).fetchone()
+        if row is None or time.time() - row[1] > max_age:
+            return None
+        return row[0]
+
+    def put_language(self, channel, lang, source):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO language_cache(channel, lang, source, checked_at) VALUES (?, ?, ?, ?)',
+                (channel.lower(), lang, source, time.time())
+            )
+
+    # ==================== POSTS ====================
+
+    def get_posts(self, channel):
+        """Return (max_id, checked_at, [(id, date, text_hash, text)] newest first) or None"""
+        channel = channel.lower()
+        with self.lock:
+            check = self.conn.execute(
+                'SELECT max_id, checked_at FROM post_checks WHERE channel = ?', (channel,)
+            ).fetchone()
+            if check is None:
+                return None
+            rows = self.conn.execute(
+                'SELECT id, date, text_hash, text FROM posts WHERE channel = ? ORDER BY id DESC', (channel,)
+            ).fetchall()
+        return check[0], check[1], rows
+
+    def put_posts(self, channel, rows, max_id):
+        """Replace the cached posts of a channel; max_id is the newest message id seen"""
+        channel = channel.lower()
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM posts WHERE channel = ?', (channel,))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO posts(channel, id, date, text_hash, text) VALUES (?, ?, ?, ?, ?)',
+                [(channel,) + tuple(row) for row in rows]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO post_checks(channel, max_id, checked_at) VALUES (?, ?, ?)',
+                (channel, max_id, time.time())
+            )
+
+    # ==================== RESULTS ====================
+
+    def add_results(self, rows):
+        """Insert a batch of result dicts in one transaction"""
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO results(channel, owner, lang, status, date) VALUES (?, ?, ?, ?, ?)',
+                [tuple(r.get(k) for k in RESULT_FIELDS) for r in rows]
+            )
+
+    def iter_results(self, chunk_size=1000, after_id=0, upto_id=None, statuses=None, langs=None,
+                     since=None, until=None):
+        """Yield result dicts in insertion order, one chunk in memory at a time
+
+        Optional filters: id range (after_id, upto_id], statuses and langs
+        (case-insensitive) and a date range (inclusive, in the results.date format).
+        """
+        where, params = [], []
+        if upto_id is not None:
+            where.append('id <= ?')
+            params.append(upto_id)
+        if statuses:
+            where.append(f"status COLLATE NOCASE IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if langs:
+            where.append(f"lang COLLATE NOCASE IN ({', '.join('?' * len(langs))})")
+            params.extend(langs)
+        if since:
+            where.append('date >= ?')
+            params.append(since)
+        if until:
+            where.append('date <= ?')
+            params.append(until)
+        sql = ('SELECT id, channel, owner, lang, status, date FROM results WHERE id > ? '
+               + ''.join(f'AND {w} ' for w in where) + 'ORDER BY id LIMIT ?')
+        last_id = after_id
+        while True:
+            with self.lock:
+                rows = self.conn.execute(sql, [last_id] + params + [chunk_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(RESULT_FIELDS, row[1:]))
+            last_id = rows[-1][0]
+
+    def max_result_id(self):
+        with self.lock:
+            return self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM results').fetchone()[0]
+
+    # ==================== SUPPRESSION ====================
+
+    def add_suppressed(self, rows):
+        """Insert (owner, reason) pairs; a newer reason replaces the old one"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO suppressed(owner, reason, added_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(owner) DO UPDATE SET reason = excluded.reason, added_at = excluded.added_at',
+                [(owner, reason, now) for owner, reason in rows]
+            )
+
+    def remove_suppressed(self, owners):
+        with self.lock, self.conn:
+            cur = self.conn.executemany('DELETE FROM suppressed WHERE owner = ?', [(o,) for o in owners])
+        return cur.rowcount
+
+    def iter_suppressed(self, chunk_size=10000):
+        """Yield suppressed owners, one chunk in memory at a time"""
+        last = ''
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    'SELECT owner FROM suppressed WHERE owner > ? ORDER BY owner LIMIT ?',
+                    (last, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            for (owner,) in rows:
+                yield owner
+            last = rows[-1][0]
+
+    def count_suppressed(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM suppressed').fetchone()[0]
+
+    def replace_suppression_list(self, handles, chunk_size=10000):
+        """Replace the handles imported from suppression_files, in one transaction"""
+        sql = 'INSERT OR IGNORE INTO suppression_list(owner) VALUES (?)'
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM suppression_list')
+            batch = []
+            for handle in handles:
+                batch.append((handle,))
+                if len(batch) >= chunk_size:
+                    self.conn.executemany(sql, batch)
+                    batch = []
+            self.conn.executemany(sql, batch)
+
+    def is_suppressed(self, owner):
+        """Exact check: stored (replied / opt-out) or imported from a list file"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT EXISTS(SELECT 1 FROM suppressed WHERE owner = ?) '
+                'OR EXISTS(SELECT 1 FROM suppression_list WHERE owner = ?)',
+                (owner, owner)
+            ).fetchone()[0] == 1
+
+    # ==================== STATS ====================
+
+    def stats(self):
+        """Row counts per table and results per status"""
+        out = {}
+        with self.lock:
+            for table in ('results', 'sent_log', 'suppressed', 'processed_channels', 'frontier', 'channels',
+                          'language_cache', 'post_checks', 'posts', 'graph_fetches', 'graph_edges', 'entities'):
+                out[table] = self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            out['by_status'] = dict(self.conn.execute(
+                "SELECT COALESCE(status, '-'), COUNT(*) FROM results GROUP BY 1 ORDER BY 2 DESC"
+            ).fetchall())
+        return out
+
+    # ==================== MIGRATION ====================
+
+    def migrate_legacy(self, sent_log_file, journal_file, xlsx_file):
+        """Import sent_log.json and old results once, on first start"""
+        if self.get_meta('legacy_migrated'):
+            return
+        # Only needed once; keeps asyncio out of offline commands (stats)
+        from .results_journal import iter_journal, iter_legacy_xlsx
+
+        if os.path.exists(sent_log_file):
+            try:
+                with open(sent_log_file, 'r', encoding='utf-8') as f:
+                    sent_log = json.load(f)
+                rows = [(owner, iso_to_epoch(sent_at)) for owner, sent_at in sent_log.items()]
+                with self.lock, self.conn:
+                    self.conn.executemany(
+                        'INSERT OR IGNORE INTO sent_log(owner, sent_at) VALUES (?, ?)',
+                        [row for row in rows if row[1] is not None]
+                    )
+            except (OSError, ValueError):
+                pass
+
+        if os.path.exists(journal_file):
+            rows = iter_journal(journal_file)
+        else:
+            rows = iter_legacy_xlsx(xlsx_file)
+
+        batch = []
+        for r in rows:
+            batch.append(r)
+            if len(batch) >= 1000:
+                self.add_results(batch)
+                batch = []
+        self.add_results(batch)
+
+        self.set_meta('legacy_migrated', datetime.now().isoformat())
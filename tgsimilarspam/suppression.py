@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Do-not-contact index
+Owners who replied, opted out or are on an exclusion list are never
+contacted again. Handles come from the state store (owners who replied,
+`tgsimilarspam suppress`) and from plain-text list files, and are
+checked before any Telegram call is made for an owner. Large lists go
+into a Bloom filter backed by the suppressed tables in state.db.
+"""
+
+import json
+import os
+import sys
+import time
+
+from .bloom import BloomFilter
+
+URL_PREFIXES = ('https://', 'http://')
+LINK_PREFIXES = ('t.me/', 'telegram.me/')
+LIST_SIGNATURE_KEY = 'suppression_list_files'
+
+
+def normalize_handle(handle):
+    """'@Name', 't.me/name', 'https://t.me/name/' -> 'name'"""
+    handle = handle.strip().lower()
+    for prefix in URL_PREFIXES:
+        if handle.startswith(prefix):
+            handle = handle[len(prefix):]
+    for prefix in LINK_PREFIXES:
+        if handle.startswith(prefix):
+            handle = handle[len(prefix):]
+    return handle.strip('/').lstrip('@')
+
+
+def iter_handles(path):
+    """Handles from a list file: one per line, '#' starts a comment"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            if line.strip():
+                handle = normalize_handle(line)
+                if handle:
+                    yield handle
+
+
+def count_lines(path):
+    """Upper bound of handles in a list file (sizes the Bloom filter)"""
+    count = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            count += chunk.count(b'\n')
+    return count + 1
+
+
+def files_signature(files):
+    """Path, size and mtime of each list file (a change means re-import)"""
+    signature = []
+    for path in files:
+        st = os.stat(path)
+        signature.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+    return json.dumps(signature)
+
+
+class SuppressionIndex:
+    def __init__(self, store=None, files=(), bloom_error_rate=0):
+        self.store = store
+        self.files = list(files)
+        # 0 = exact set; e.g. 0.001 = Bloom filter, 0.1% of misses confirmed on disk
+        self.bloom_error_rate = bloom_error_rate
+        self.exact = set()
+        self.bloom = None
+        self.hits = 0
+        self.disk_checks = 0
+        self.false_positives = 0
+        self.load_seconds = 0.0
+
+    def load(self):
+        """Read the store and all list files (list files go to state.db in Bloom mode)"""
+        started = time.perf_counter()
+        files = []
+        for path in self.files:
+            if os.path.exists(path):
+                files.append(path)
+            else:
+                print(f"[ERROR] Suppression list not found: {path}")
+
+        # Bloom hits are confirmed in state.db, so without a store the lists stay exact
+        if self.bloom_error_rate and self.store is not None:
+            capacity = sum(count_lines(path) for path in files) + self.store.count_suppressed()
+            self.bloom = BloomFilter(capacity, self.bloom_error_rate)
+            for handle in self.store.iter_suppressed():
+                self.bloom.add(handle)
+            signature = files_signature(files)
+            if self.store.get_meta(LIST_SIGNATURE_KEY) != signature:
+                self.store.replace_suppression_list(self._listed(files))
+                self.store.set_meta(LIST_SIGNATURE_KEY, signature)
+            else:
+                for _ in self._listed(files):
+                    pass
+        else:
+            if self.store is not None:
+                self.exact.update(self.store.iter_suppressed())
+            for path in files:
+                self.exact.update(iter_handles(path))
+        self.load_seconds = time.perf_counter() - started
+        return self
+
+    def _listed(self, files):
+        """Handles of all list files, each added to the Bloom filter on the way"""
+        for path in files:
+            for handle in iter_handles(path):
+                self.bloom.add(handle)
+                yield handle
+
+    def __contains__(self, owner):
+        handle = normalize_handle(owner)
+        if handle in self.exact:
+            return True
+        if self.bloom is None or handle not in self.bloom:
+            return False
+        self.disk_checks += 1
+        if self.store.is_suppressed(handle):
+            return True
+        self.false_positives += 1
+        return False
+
+    def __len__(self):
+        return len(self.exact) + (len(self.bloom) if self.bloom is not None else 0)
+
+    def check(self, owner):
+        """True (and counted) if the owner must not be contacted"""
+        if owner in self:
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, owner, reason):
+        """Suppress an owner from now on, in this run and in later ones"""
+        handle = normalize_handle(owner)
+        if handle in self.exact:
+            return
+        self.exact.add(handle)
+        if self.store is not None:
+            self.store.add_suppressed([(handle, reason)])
+
+    def memory_bytes(self):
+        """Approximate memory of the index (set table + strings, or bit array)"""
+        size = sys.getsizeof(self.exact) + sum(sys.getsizeof(h) for h in self.exact)
+        if self.bloom is not None:
+            size += self.bloom.nbytes
+        return size
+
+    def summary(self):
+        line = f"{len(self)} handles, {self.memory_bytes() / 1e6:.1f} MB, loaded in {self.load_seconds:.2f}s"
+        if self.bloom is not None:
+            line += (f", Bloom filter + exact set on disk, {self.false_positives} of "
+                     f"{self.disk_checks} disk checks were false positives")
+        return line
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Record / replay Telegram client
+RecordingClient wraps a real TelegramClient and saves every get_entity,
+GetFullChannelRequest, GetChannelRecommendationsRequest and get_messages
+answer (TL-serialized) to a JSONL fixture file. ReplayClient answers the
+same calls offline from such fixtures or from a synthetic channel graph,
+with configurable latency and injected FloodWait errors, so the whole
+bot can run (and be benchmarked) without a Telegram account.
+"""
+
+import asyncio
+import base64
+import inspect
+import json
+import random
+from datetime import datetime, timedelta
+
+from telethon import utils
+from telethon.errors import FloodWaitError
+from telethon.extensions import BinaryReader
+from telethon.tl import types
+from telethon.tl.functions.channels import GetFullChannelRequest, GetChannelRecommendationsRequest
+from telethon.tl.custom.dialog import Dialog
+from telethon.tl.patched import Message
+
+DIALOG_PAGE_SIZE = 100
+
+RECORDED_REQUESTS = {
+    GetFullChannelRequest: 'full_channel',
+    GetChannelRecommendationsRequest: 'recommendations',
+}
+
+
+class ReplayMiss(LookupError):
+    """A request type ReplayClient has no fixtures or synthetic answers for"""
+
+
+def peer_key(entity):
+    """Fixture key of a username or peer: lowercased name or marked peer id"""
+    if isinstance(entity, str):
+        return entity.lstrip('@').lower()
+    try:
+        return str(utils.get_peer_id(entity))
+    except TypeError:
+        return str(entity)
+
+
+def _encode(obj):
+    if isinstance(obj, list):
+        return [_encode(o) for o in obj]
+    return base64.b64encode(bytes(obj)).decode('ascii')
+
+
+def _decode(data):
+    if isinstance(data, list):
+        return [_decode(d) for d in data]
+    return BinaryReader(base64.b64decode(data)).tgread_object()
+
+
+def _tl(cls, **kwargs):
+    """Build a TL object; required fields this layer has and we do not set are None"""
+    for name, param in inspect.signature(cls.__init__).parameters.items():
+        if name != 'self' and param.default is inspect.Parameter.empty:
+            kwargs.setdefault(name, None)
+    return cls(**kwargs)
+
+
+def load_fixtures(path):
+    """Return {(call, key): record}; a later record of the same call wins"""
+    fixtures = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                fixtures[(record['call'], record['key'])] = record
+    return fixtures
+
+
+# ==================== RECORDING ====================
+
+class RecordingClient:
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self.recorded = 0
+
+    def __getattr__(self, name):
+        # connect, get_me, send_message, ... go straight to the real client
+        return getattr(self.client, name)
+
+    def _write(self, call, key, result=None, error=None):
+        record = {'call': call, 'key': key}
+        if error is not None:
+            record['error'] = type(error).__name__
+            record['seconds'] = getattr(error, 'seconds', 0)
+        else:
+            record['tl'] = _encode(result)
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        self.recorded += 1
+
+    async def _record(self, call, key, coro):
+        try:
+            result = await coro
+        except FloodWaitError as e:
+            self._write(call, key, error=e)
+            raise
+        try:
+            self._write(call, key, result)
+        except Exception:
+            # Never break a live run because one answer could not be saved
+            pass
+        return result
+
+    async def get_entity(self, entity):
+        return await self._record('get_entity', peer_key(entity), self.client.get_entity(entity))
+
+    async def get_messages(self, entity, *args, **kwargs):
+        return await self._record('get_messages', peer_key(entity),
+                                  self.client.get_messages(entity, *args, **kwargs))
+
+    async def __call__(self, request, *args, **kwargs):
+        call = RECORDED_REQUESTS.get(type(request))
+        if call is None:
+            return await self.client(request, *args, **kwargs)
+        return await self._record(call, peer_key(request.channel), self.client(request, *args, **kwargs))
+
+    async def disconnect(self):
+        self.file.close()
+        return await self.client.disconnect()
+
+
+# ==================== SYNTHETIC GRAPH ====================
+
+RU_POSTS = [
+    "Новости крипторынка и обзор главных событий дня",
+    "Сигнал на покупку, цель плюс десять процентов",
+    "Аналитика рынка и прогнозы на неделю",
+]
+EN_POSTS = [
+    "Daily crypto market news and the main events of the day",
+    "Buy signal, target plus ten percent",
+    "Market analysis and weekly forecast",
+]
+
+
+class SyntheticGraph:
+    """Deterministic channel graph: chan0 .. chan{n-1}, owners owner0 .. owner{n-1}"""
+
+    CHANNEL_ID_BASE = 1000
+    USER_ID_BASE = 10 ** 8
+
+    def __init__(self, nodes=1000, fan=10, seed=0):
+        self.nodes = nodes
+        self.fan = fan
+        self.seed = seed
+
+    def seeds(self, count=5):
+        return [f"chan{i}" for i in range(min(count, self.nodes))]
+
+    def _index(self, prefix, name):
+        name = name.lstrip('@').lower()
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            i = int(name[len(prefix):])
+            if i < self.nodes:
+                return i
+        return None
+
+    def _access_hash(self, i):
+        return (i * 7919 + self.seed * 104729 + 13) % (2 ** 62)
+
+    def channel(self, i):
+        topic = 'crypto signals' if i % 4 == 0 else 'daily news'
+        return types.Channel(
+            id=self.CHANNEL_ID_BASE + i, title=f"{topic} {i}", photo=types.ChatPhotoEmpty(),
+            date=None, access_hash=self._access_hash(i), username=f"chan{i}", broadcast=True
+        )
+
+    def user(self, i):
+        return types.User(
+            id=self.USER_ID_BASE + i, access_hash=self._access_hash(i), username=f"owner{i}",
+            first_name=f"Owner {i}"
+        )
+
+    def entity(self, key):
+        """Entity for a username or marked peer id key, None if unknown"""
+        i = self._index('chan', key)
+        if i is not None:
+            return self.channel(i)
+        i = self._index('owner', key)
+        if i is not None:
+            return self.user(i)
+        if key.lstrip('-').isdigit():
+            peer_id = int(key)
+            if peer_id < 0:
+                i = utils.resolve_id(peer_id)[0] - self.CHANNEL_ID_BASE
+                if 0 <= i < self.nodes:
+                    return self.channel(i)
+            elif 0 <= peer_id - self.USER_ID_BASE < self.nodes:
+                return self.user(peer_id - self.USER_ID_BASE)
+        return None
+
+    def channel_index(self, peer):
+        i = utils.resolve_id(utils.get_peer_id(peer))[0] - self.CHANNEL_ID_BASE
+        return i if 0 <= i < self.nodes else None
+
+    def user_index(self, peer):
+        i = utils.get_peer_id(peer) - self.USER_ID_BASE
+        return i if 0 <= i < self.nodes else None
+
+    def about(self, i):
+        """Mix of RU / EN / undecided descriptions, with and without an owner"""
+        if i % 5 == 0:
+            # ~20% Cyrillic: undecided, language comes from posts
+            text = "🚀 Крипта crypto trading signals daily"
+        elif i % 3 == 0:
+            text = "Канал про криптовалюту и трейдинг. Ежедневные сигналы и аналитика."
+        else:
+            text = "Crypto trading channel. Daily signals and market analysis."
+        if i % 10 == 9:
+            return text
+        if i % 2:
+            text += f"\nПо вопросам рекламы: @owner{i}"
+        else:
+            text += f"\nContact: t.me/owner{i}"
+        if i % 7 == 0:
+            text += f"\nOur bot: @chan{i}_bot"
+        return text
+
+    def full(self, i):
+        full_chat = _tl(
+            types.ChannelFull, id=self.CHANNEL_ID_BASE + i, about=self.about(i), read_inbox_max_id=0,
+            read_outbox_max_id=0, unread_count=0, chat_photo=types.PhotoEmpty(id=0),
+            notify_settings=types.PeerNotifySettings(), bot_info=[], pts=1,
+            participants_count=1000 + i
+        )
+        return types.messages.ChatFull(full_chat=full_chat, chats=[self.channel(i)], users=[])
+
+    def neighbours(self, i):
+        """Half tree edges (every node reachable from chan0), half random edges"""
+        tree = self.fan // 2 or 1
+        rng = random.Random(self.seed * 1000003 + i)
+        out = [(i * tree + j + 1) % self.nodes for j in range(tree)]
+        out += [rng.randrange(self.nodes) for _ in range(self.fan - tree)]
+        return [j for j in dict.fromkeys(out) if j != i]
+
+    def recommendations(self, i):
+        return types.messages.Chats(chats=[self.channel(j) for j in self.neighbours(i)])
+
+    def history(self, i):
+        """Private chat with owner i, newest first: they replied (i % 6 == 1), we wrote last (i % 6 == 4)"""
+        if i % 6 not in (1, 4):
+            return []
+        peer = types.PeerUser(self.USER_ID_BASE + i)
+        date = datetime(2024, 1, 1) + timedelta(minutes=i)
+        ours = Message(id=1, peer_id=peer, date=date, message=EN_POSTS[0], out=True)
+        if i % 6 == 4:
+            return [ours]
+        return [Message(id=2, peer_id=peer, date=date + timedelta(seconds=30), message="Not interested"), ours]
+
+    def dialogs(self):
+        """(owner, last message) of every private chat, newest first"""
+        chats = [(self.user(i), self.history(i)[0]) for i in range(self.nodes) if i % 6 in (1, 4)]
+        return sorted(chats, key=lambda chat: chat[1].date, reverse=True)
+
+    def posts(self, i, limit):
+        texts = RU_POSTS if i % 2 else EN_POSTS
+        peer = types.PeerChannel(self.CHANNEL_ID_BASE + i)
+        return [
+            Message(id=k + 1, peer_id=peer, date=datetime(2024, 1, 1), message=texts[k % len(texts)])
+            for k in range(min(limit, 5))
+        ]
+
+
+# ==================== REPLAY ====================
+
+class ReplayClient:
+    def __init__(self, fixtures=None, graph=None, latency=0.0, jitter=0.0,
+                 flood_every=0, flood_seconds=1, seed=0):
+        self.fixtures = load_fixtures(fixtures) if isinstance(fixtures, str) else (fixtures or {})
+        self.graph = graph
+        self.latency = latency
+        self.jitter = jitter
+        # Every flood_every-th call of a request type raises FloodWaitError
+        self.flood_every = flood_every
+        self.flood_seconds = flood_seconds
+        self.rng = random.Random(seed)
+        self.calls = {}
+        self.floods = 0
+        # Lets replayed messages render .text like messages of a real client
+        self.parse_mode = None
+
+    async def _tick(self, call):
+        self.calls[call] = self.calls.get(call, 0) + 1
+        delay = self.latency + (self.rng.random() * self.jitter if self.jitter else 0.0)
+        await asyncio.sleep(delay)
+        if self.flood_every and self.calls[call] % self.flood_every == 0:
+            self.floods += 1
+            raise FloodWaitError(request=None, capture=self.flood_seconds)
+
+    def _fixture(self, call, key):
+        record = self.fixtures.get((call, key))
+        if record is None:
+            return None, False
+        if 'error' in record:
+            if record['error'] == 'FloodWaitError':
+                raise FloodWaitError(request=None, capture=record.get('seconds', 0))
+            raise ValueError(f"{call} {key}: {record['error']}")
+        return _decode(record['tl']), True
+
+    def _finish(self, messages):
+        for msg in messages:
+            if isinstance(msg, Message):
+                msg._client = self
+        return messages
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def is_user_authorized(self):
+        return True
+
+    async def get_me(self):
+        return types.User(id=1, first_name='Replay', is_self=True)
+
+    async def get_entity(self, entity):
+        await self._tick('get_entity')
+        key = peer_key(entity)
+        result, found = self._fixture('get_entity', key)
+        if not found and self.graph is not None:
+            result = self.graph.entity(key)
+            found = result is not None
+        if not found:
+            raise ValueError(f'No user has "{key}" as username')
+        return result
+
+    async def __call__(self, request, *args, **kwargs):
+        call = RECORDED_REQUESTS.get(type(request))
+        if call is None:
+            raise ReplayMiss(f"ReplayClient has no answers for {type(request).__name__}")
+        await self._tick(call)
+        result, found = self._fixture(call, peer_key(request.channel))
+        if found:
+            return result
+        i = self.graph.channel_index(request.channel) if self.graph is not None else None
+        if i is None:
+            raise ValueError(f"Unknown channel {peer_key(request.channel)}")
+        return self.graph.full(i) if call == 'full_channel' else self.graph.recommendations(i)
+
+    async def get_messages(self, entity, limit=None, min_id=0, **kwargs):
+        await self._tick('get_messages')
+        result, found = self._fixture('get_messages', peer_key(entity))
+        if found:
+            result = [msg for msg in result if getattr(msg, 'id', 0) > min_id]
+            return self._finish(result[:limit] if limit else result)
+        if self.graph is not None and isinstance(entity, (types.Channel, types.InputPeerChannel)):
+            i = self.graph.channel_index(entity)
+            if i is not None:
+                return self._finish([msg for msg in self.graph.posts(i, limit or 5) if msg.id > min_id])
+        if self.graph is not None and isinstance(entity, (types.User, types.InputPeerUser)):
+            i = self.graph.user_index(entity)
+            if i is not None:
+                return self._finish(self.graph.history(i)[:limit])
+        return []
+
+    async def get_dialogs(self, limit=None, offset_peer=None, **kwargs):
+        """One page of the synthetic graph's private chats after offset_peer, one call like Telethon"""
+        await self._tick('dialogs')
+        chats = self.graph.dialogs() if self.graph is not None else []
+        start = 0
+        if offset_peer is not None:
+            ids = [user.id for user, _ in chats]
+            peer_id = getattr(offset_peer, 'user_id', None)
+            start = ids.index(peer_id) + 1 if peer_id in ids else len(chats)
+        page = []
+        for user, message in chats[start:start + min(limit or DIALOG_PAGE_SIZE, DIALOG_PAGE_SIZE)]:
+            message._client = self
+            dialog = _tl(types.Dialog, peer=types.PeerUser(user.id), top_message=message.id,
+                         read_inbox_max_id=0, read_outbox_max_id=0, unread_count=0,
+                         unread_mentions_count=0, unread_reactions_count=0,
+                         notify_settings=types.PeerNotifySettings())
+            page.append(Dialog(self, dialog, {user.id: user}, message))
+        return page
+
+    def add_event_handler(self, callback, event=None):
+        # Replayed runs get no updates
+        pass
+
+    def remove_event_handler(self, callback, event=None):
+        pass
+
+    async def send_message(self, entity, message, **kwargs):
+        await self._tick('send_message')
+
+    async def delete_messages(self, entity, message_ids, **kwargs):
+        await self._tick('delete_messages')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Span tracing
+Optional spans around each phase of a crawl (resolve, full info, posts,
+language, recommendations, saving, sleeps, API waits), written at the
+end of the run as Chrome trace JSON (open in chrome://tracing or
+ui.perfetto.dev). Every asyncio task gets its own lane, so concurrent
+discovery workers show side by side. When disabled, span() returns one
+shared no-op context manager and nothing is recorded.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import time
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'lane', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.lane = self.tracer.lane()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add(self.name, self.start, end, self.lane, self.args)
+        return False
+
+
+class Tracer:
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = bool(path)
+        self.events = []
+        self.lanes = {}
+        self.origin = time.perf_counter_ns()
+
+    def enable(self, path):
+        self.path = path
+        self.enabled = bool(path)
+
+    def span(self, name, **args):
+        """Context manager timing one phase; args show up in the trace viewer"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _Span(self, name, args)
+
+    def lane(self):
+        """Trace thread id of the current asyncio task (0 outside the loop)"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else None
+        lane = self.lanes.get(key)
+        if lane is None:
+            lane = len(self.lanes)
+            self.lanes[key] = lane
+            self.events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane,
+                'args': {'name': task.get_name() if task is not None else 'main'},
+            })
+        return lane
+
+    def add(self, name, start_ns, end_ns, lane, args=None):
+        event = {
+            'name': name, 'ph': 'X', 'pid': 1, 'tid': lane,
+            'ts': (start_ns - self.origin) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+        }
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def totals(self):
+        """Total seconds per span name"""
+        out = {}
+        for event in self.events:
+            if event['ph'] == 'X':
+                out[event['name']] = out.get(event['name'], 0.0) + event['dur'] / 1e6
+        return out
+
+    def write(self):
+        """Write the Chrome trace JSON (tmp file + rename)"""
+        if not self.enabled:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def instrument(obj, methods):
+    """Wrap async methods of one object in spans; {method_name: span_name}.
+    Done per instance and only when tracing is on, so a disabled tracer adds no call layer."""
+    tracer = obj.tracer
+    for method_name, span_name in methods.items():
+        func = getattr(obj, method_name)
+
+        def wrapper(*args, _func=func, _span=span_name, **kwargs):
+            span_args = {'target': args[0]} if args and isinstance(args[0], str) else {}
+            return _traced_call(tracer, _span, span_args, _func(*args, **kwargs))
+
+        functools.update_wrapper(wrapper, func)
+        setattr(obj, method_name, wrapper)
+
+
+async def _traced_call(tracer, name, args, coro):
+    with tracer.span(name, **args):
+        return await coro
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Visited-channel sets
+Which channels the current crawl has already taken. Two backends with
+the same interface (add, in, len, reset, memory_bytes, summary):
+- VisitedSet: exact in-memory set of interned names, for normal crawls
+- BloomVisitedSet: Bloom filter in memory, visited table in state.db,
+  a few bytes per channel for multi-million-node crawls
+"""
+
+import sys
+
+from .bloom import BloomFilter
+
+VISITED_FLUSH_SIZE = 1000
+
+
+class VisitedSet:
+    def __init__(self):
+        self.names = set()
+
+    def reset(self, channels=()):
+        """Forget everything, then add channels (from a resumed crawl)"""
+        self.names = {sys.intern(channel) for channel in channels}
+
+    def add(self, channel):
+        # Interned: recommendations return a new string for every sighting of a name
+        self.names.add(sys.intern(channel))
+
+    def __contains__(self, channel):
+        return channel in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def flush(self):
+        pass
+
+    def memory_bytes(self):
+        """Set table plus the name strings"""
+        return sys.getsizeof(self.names) + sum(sys.getsizeof(name) for name in self.names)
+
+    def summary(self):
+        return f"{len(self)} channels, exact set, {self.memory_bytes() / 1e6:.1f} MB"
+
+
+class BloomVisitedSet:
+    def __init__(self, store, capacity=1000000, error_rate=0.001):
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        # Added but not yet written to disk
+        self.pending = set()
+        self.count = 0
+        self.disk_checks = 0
+        self.false_positives = 0
+
+    def reset(self, channels=()):
+        """Forget everything, then add channels (from a resumed crawl)"""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.pending = set()
+        self.count = 0
+        self.store.clear_visited()
+        for channel in channels:
+            self.add(channel)
+        self.flush()
+
+    def add(self, channel):
+        if channel in self:
+            return
+        self.bloom.add(channel)
+        self.pending.add(channel)
+        self.count += 1
+        if len(self.pending) >= VISITED_FLUSH_SIZE:
+            self.flush()
+
+    def __contains__(self, channel):
+        if channel not in self.bloom:
+            return False
+        if channel in self.pending:
+            return True
+        self.disk_checks += 1
+        if self.store.is_visited(channel):
+            return True
+        self.false_positives += 1
+        return False
+
+    def __len__(self):
+        return self.count
+
+    def flush(self):
+        """Write pending names to the on-disk set"""
+        if self.pending:
+            self.store.add_visited(self.pending)
+            self.pending = set()
+
+    def memory_bytes(self):
+        """Bit array plus the names not yet on disk"""
+        return (self.bloom.nbytes + sys.getsizeof(self.pending)
+                + sum(sys.getsizeof(name) for name in self.pending))
+
+    def false_positive_rate(self):
+        """Expected rate at the current fill"""
+        return self.bloom.false_positive_rate()
+
+    def summary(self):
+        return (f"{len(self)} channels, Bloom filter {self.memory_bytes() / 1e6:.1f} MB + exact set on disk, "
+                f"~{self.false_positive_rate() * 100:.3f}% false positives expected, "
+                f"{self.false_positives} of {self.disk_checks} disk checks were false positives")
+
+
+def make_visited(config, store):
+    """Backend chosen by config.visited_backend"""
+    if config.visited_backend == 'bloom':
+        return BloomVisitedSet(store, config.visited_bloom_capacity, config.visited_bloom_error_rate)
+    return VisitedSet()